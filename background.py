@@ -0,0 +1,309 @@
+"""Chunked world background rendered on demand around the camera."""
+
+import math
+from collections import OrderedDict
+
+import pygame
+import config
+import procgen
+import render
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; fall back to pygame.draw
+    np = None
+
+
+class ChunkedBackground:
+    """Tile/dune/speckle background split into square chunks kept in an LRU cache.
+
+    The layout (tile palette indices, speckles) comes from ``procgen`` one
+    generation cell at a time, the first time a chunk over that cell is
+    rendered; pixels are rendered per chunk when the camera needs them.
+    Callables in ``static_layers`` are drawn on top of each chunk as it is
+    rendered, so geometry that never moves costs nothing per frame.
+    """
+
+    def __init__(self, biome: str, width: int, height: int, gen: procgen.WorldGen):
+        self.biome = biome
+        self.gen = gen
+        self.width = width
+        self.height = height
+        biome_cfg = config.BIOMES[biome]
+        self.base_colors = biome_cfg["base_colors"]
+        self.dune_color = biome_cfg["dune_color"]
+
+        self.tile = config.BG_TILE
+        self.cols = math.ceil(width / self.tile)
+        self.rows = math.ceil(height / self.tile)
+        self.tiles = bytearray(self.cols * self.rows)  # filled per generation cell, see _fill_tiles
+        self._filled = set()
+
+        # Gentle sine-wave bands: (base y, amplitude, wavelength)
+        self.bands = gen.bands()
+        # Speckles for grain/grass, (x, y, radius), per generation cell
+        self._speckles = {}
+
+        self.chunk_size = config.BG_CHUNK_SIZE
+        self.max_bytes = int(config.BG_CHUNK_CACHE_MB * 1024 * 1024)  # chunks and their resampled copies
+        self.chunks: OrderedDict[tuple[int, int], pygame.Surface] = OrderedDict()
+        self.scaled: dict[tuple[int, int], pygame.Surface] = {}  # chunks resampled to scaled_factor
+        self.scaled_factor = 1.0
+        self.static_layers = []
+        self.disk = None  # optional texcache.WorldTextures
+        self.use_numpy = np is not None and config.BG_USE_NUMPY
+        self._tile_grid = None
+        self._palette = None
+
+    @property
+    def max_chunks(self) -> int:
+        """Chunks that fit in ``max_bytes``, each with its resampled copy while scaled ones are kept."""
+        chunk_bytes = self.chunk_size * self.chunk_size * 4
+        if self.scaled:
+            chunk_bytes *= 1 + self.scaled_factor * self.scaled_factor
+        return max(1, int(self.max_bytes // chunk_bytes))
+
+    def chunk_rect(self, cx: int, cy: int) -> pygame.Rect:
+        x0 = cx * self.chunk_size
+        y0 = cy * self.chunk_size
+        return pygame.Rect(
+            x0, y0, min(self.chunk_size, self.width - x0), min(self.chunk_size, self.height - y0)
+        )
+
+    def chunks_in_rect(self, rect: pygame.Rect):
+        """Yield chunk coordinates overlapping ``rect`` (world space), clamped to the world."""
+        size = self.chunk_size
+        cx0 = max(0, rect.left // size)
+        cy0 = max(0, rect.top // size)
+        cx1 = min((self.width - 1) // size, (rect.right - 1) // size)
+        cy1 = min((self.height - 1) // size, (rect.bottom - 1) // size)
+        for cy in range(cy0, cy1 + 1):
+            for cx in range(cx0, cx1 + 1):
+                yield cx, cy
+
+    def _fill_tiles(self, area: pygame.Rect):
+        """Generate the tile layout of the cells under ``area`` that have none yet."""
+        for cell in self.gen.cells_in_rect(area):
+            if cell in self._filled:
+                continue
+            self._filled.add(cell)
+            block, values = self.gen.tiles(*cell)
+            for row in range(block.height):
+                start = (block.top + row) * self.cols + block.left
+                self.tiles[start:start + block.width] = values[row * block.width:(row + 1) * block.width]
+
+    def render_chunk(self, cx: int, cy: int) -> pygame.Surface:
+        area = self.chunk_rect(cx, cy)
+        if self.use_numpy:
+            surf = self._render_numpy(area)
+        else:
+            surf = self._render_python(area)
+        for layer in self.static_layers:
+            layer(surf, area)
+        return surf
+
+    def _band_columns(self, area: pygame.Rect):
+        """Yield the world y of each column in ``area`` for every dune band crossing it."""
+        for base_y, amplitude, wavelength in self.bands:
+            if base_y + amplitude + 2 < area.top or base_y - amplitude - 1 > area.bottom:
+                continue
+            ys = [int(base_y + amplitude * math.sin(x / wavelength)) for x in range(area.left, area.right)]
+            yield ys
+
+    def _speckles_in(self, area: pygame.Rect):
+        # Speckles centred just outside the area still spill into it.
+        found = []
+        for cell in self.gen.cells_in_rect(area.inflate(6, 6)):
+            speckles = self._speckles.get(cell)
+            if speckles is None:
+                speckles = self._speckles[cell] = self.gen.speckles(*cell)
+            for rx, ry, radius in speckles:
+                if area.colliderect((rx - radius, ry - radius, radius * 2 + 1, radius * 2 + 1)):
+                    found.append((rx, ry, radius))
+        return found
+
+    def _render_python(self, area: pygame.Rect) -> pygame.Surface:
+        self._fill_tiles(area)
+        surf = render.new_surface(area.size)
+        tile = self.tile
+
+        tx0, tx1 = area.left // tile, (area.right - 1) // tile
+        ty0, ty1 = area.top // tile, (area.bottom - 1) // tile
+        for ty in range(ty0, ty1 + 1):
+            row = ty * self.cols
+            for tx in range(tx0, tx1 + 1):
+                color = self.base_colors[self.tiles[row + tx]]
+                pygame.draw.rect(surf, color, (tx * tile - area.left, ty * tile - area.top, tile, tile))
+
+        for ys in self._band_columns(area):
+            for lx, y in enumerate(ys):
+                y -= area.top
+                pygame.draw.line(surf, self.dune_color, (lx, y), (lx, y + 2))
+
+        for rx, ry, radius in self._speckles_in(area):
+            pygame.draw.circle(surf, self.dune_color, (rx - area.left, ry - area.top), radius)
+        return surf
+
+    def _render_numpy(self, area: pygame.Rect) -> pygame.Surface:
+        self._fill_tiles(area)
+        surf = render.new_surface(area.size)
+        if self._tile_grid is None:
+            self._tile_grid = np.frombuffer(self.tiles, dtype=np.uint8).reshape(self.rows, self.cols)
+            self._palette = np.array([surf.map_rgb(c) for c in self.base_colors], dtype=np.uint32)
+        width, height = area.size
+        tile = self.tile
+        # Transposed surfarray view: C-contiguous, indexed [y, x], writes go straight to the surface.
+        pixels = pygame.surfarray.pixels2d(surf).T
+
+        tx0, tx1 = area.left // tile, (area.right - 1) // tile
+        ty0, ty1 = area.top // tile, (area.bottom - 1) // tile
+        block = self._palette[self._tile_grid[ty0:ty1 + 1, tx0:tx1 + 1]]
+        rows, cols = block.shape
+        left, top = area.left - tx0 * tile, area.top - ty0 * tile
+        if left == 0 and top == 0 and (height, width) == (rows * tile, cols * tile):
+            pixels.reshape(rows, tile, cols, tile)[...] = block[:, None, :, None]
+        else:
+            expanded = np.broadcast_to(block[:, None, :, None], (rows, tile, cols, tile))
+            expanded = expanded.reshape(rows * tile, cols * tile)
+            pixels[...] = expanded[top:top + height, left:left + width]
+        dune = surf.map_rgb(self.dune_color)
+
+        lx = np.arange(width)
+        for band_ys in self._band_columns(area):
+            first = np.array(band_ys) - area.top
+            for dy in range(3):
+                row = first + dy
+                inside = (row >= 0) & (row < height)
+                pixels[row[inside], lx[inside]] = dune
+
+        speckles = self._speckles_in(area)
+        for radius, (ox, oy) in _speckle_stamps().items():
+            centres = [(rx - area.left, ry - area.top) for rx, ry, r in speckles if r == radius]
+            if not centres:
+                continue
+            centres = np.array(centres)
+            px = (centres[:, 0:1] + ox).ravel()
+            py = (centres[:, 1:2] + oy).ravel()
+            inside = (px >= 0) & (px < width) & (py >= 0) & (py < height)
+            pixels[py[inside], px[inside]] = dune
+
+        del pixels  # release the surface lock
+        return surf
+
+    def get_chunk(self, cx: int, cy: int) -> pygame.Surface:
+        key = (cx, cy)
+        surf = self.chunks.get(key)
+        if surf is None:
+            if self.disk is not None:
+                surf = self.disk.load(cx, cy, self.chunk_rect(cx, cy).size)
+            if surf is None:
+                surf = self.render_chunk(cx, cy)
+                if self.disk is not None:
+                    self.disk.store(cx, cy, surf)
+            self.chunks[key] = surf
+        else:
+            self.chunks.move_to_end(key)
+        return surf
+
+    def _evict(self, keep):
+        # Oldest first; chunks drawn this frame are never dropped, even over budget.
+        for key in list(self.chunks):
+            if len(self.chunks) <= self.max_chunks:
+                break
+            if key not in keep:
+                del self.chunks[key]
+                self.scaled.pop(key, None)
+
+    def _scaled_chunk(self, cx: int, cy: int, scale: float) -> pygame.Surface:
+        """Chunk resampled once for a reduced internal resolution (see Camera.scale)."""
+        if scale != self.scaled_factor:
+            self.scaled.clear()
+            self.scaled_factor = scale
+        chunk = self.get_chunk(cx, cy)
+        surf = self.scaled.get((cx, cy))
+        if surf is None:
+            width, height = chunk.get_size()
+            size = (max(1, round(width * scale)), max(1, round(height * scale)))
+            surf = self.scaled[(cx, cy)] = pygame.transform.smoothscale(chunk, size)
+            render.note_allocation()
+        return surf
+
+    def draw(self, surface: pygame.Surface, camera):
+        scale = camera.scale
+        ox, oy = int(camera.offset.x), int(camera.offset.y)
+        width, height = surface.get_size()
+        view = pygame.Rect(ox, oy, math.ceil(width / scale), math.ceil(height / scale))
+        visible = set()
+        for cx, cy in self.chunks_in_rect(view):
+            visible.add((cx, cy))
+            if scale == 1.0:
+                chunk = self.get_chunk(cx, cy)
+                surface.blit(chunk, (cx * self.chunk_size - ox, cy * self.chunk_size - oy))
+            else:
+                chunk = self._scaled_chunk(cx, cy, scale)
+                x = round(cx * self.chunk_size * scale) - round(ox * scale)
+                y = round(cy * self.chunk_size * scale) - round(oy * scale)
+                surface.blit(chunk, (x, y))
+
+        # Render a few chunks just outside the viewport ahead of time.
+        budget = config.BG_CHUNK_PREFETCH
+        margin = view.inflate(self.chunk_size * 2, self.chunk_size * 2)
+        for key in self.chunks_in_rect(margin):
+            if budget <= 0:
+                break
+            if key not in self.chunks:
+                self.get_chunk(*key)
+                budget -= 1
+        self._evict(visible)
+
+    def clear(self):
+        self.chunks.clear()
+        self.scaled.clear()
+
+    def memory_bytes(self) -> int:
+        """Bytes held by rendered chunks (full and resampled) and the tile layout."""
+        pixels = sum(surf.get_width() * surf.get_height() * surf.get_bytesize() for surf in self.chunks.values())
+        pixels += sum(surf.get_width() * surf.get_height() * surf.get_bytesize() for surf in self.scaled.values())
+        return pixels + len(self.tiles)
+
+
+_STAMPS = {}
+
+
+def _speckle_stamps():
+    """Pixel offsets covered by ``pygame.draw.circle`` for each speckle radius."""
+    if not _STAMPS:
+        for radius in (1, 2):
+            size = radius * 2 + 3
+            stamp = pygame.Surface((size, size))
+            pygame.draw.circle(stamp, (255, 255, 255), (size // 2, size // 2), radius)
+            mask = pygame.surfarray.pixels_red(stamp) > 0
+            ox, oy = np.nonzero(mask)
+            _STAMPS[radius] = (ox - size // 2, oy - size // 2)
+    return _STAMPS
+
+
+def check_numpy_path(biome: str, seed: int, width: int = 2048, height: int = 1536) -> bool:
+    """Return True if the NumPy and pygame.draw paths render identical chunks."""
+    if np is None:
+        return False
+    background = ChunkedBackground(biome, width, height, procgen.WorldGen(seed, biome, width, height))
+    for cx, cy in background.chunks_in_rect(pygame.Rect(0, 0, width, height)):
+        area = background.chunk_rect(cx, cy)
+        fast = pygame.image.tobytes(background._render_numpy(area), "RGB")
+        slow = pygame.image.tobytes(background._render_python(area), "RGB")
+        if fast != slow:
+            return False
+    return True
+
+
+if __name__ == "__main__":
+    import sys
+
+    ok = True
+    for biome in config.BIOMES:
+        for seed in (0, 1, 12345):
+            match = check_numpy_path(biome, seed)
+            print(f"{biome} seed={seed}: {'ok' if match else 'MISMATCH'}")
+            ok = ok and match
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,326 @@
+"""Benchmarks for the hot paths, with stress scenarios and baseline comparison.
+
+Runs under SDL's dummy video driver. Examples::
+
+    python bench.py --out baseline.json
+    python bench.py --compare baseline.json --threshold 0.25
+    python bench.py --filter screen4k
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+
+import config
+import controls
+import effects
+import player
+import portals
+import saveio
+import world
+
+RES_540P = (960, 540)
+RES_1080P = (1920, 1080)
+RES_4K = (3840, 2160)
+
+
+def _world_size(width, height):
+    return {"WORLD_WIDTH": width, "WORLD_HEIGHT": height, "PLAYER_SPAWN": (width // 2, height // 2)}
+
+
+# Config overrides applied while a scenario runs.
+SCENARIOS = {
+    "base": {},
+    "world4x": _world_size(config.WORLD_WIDTH * 2, config.WORLD_HEIGHT * 2),
+    "rocks10x": {
+        "DESERT_ROCK_DENSITY": config.DESERT_ROCK_DENSITY * 10,
+        "FOREST_ROCK_DENSITY": config.FOREST_ROCK_DENSITY * 10,
+    },
+    "pickups5k": {"PICKUP_COUNT_RANGE": (5000, 5000)},
+    "screen4k": {},
+}
+
+SEED = 1234
+MOVE_RIGHT = controls.KeySet([pygame.K_RIGHT, pygame.K_DOWN])
+
+
+@contextlib.contextmanager
+def overrides(values: dict):
+    saved = {name: getattr(config, name) for name in values}
+    for name, value in values.items():
+        setattr(config, name, value)
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            setattr(config, name, value)
+
+
+def measure(fn, min_time: float = 0.3, min_runs: int = 3, max_runs: int = 2000, warmup: bool = True) -> dict:
+    """Time ``fn`` repeatedly; per-call milliseconds."""
+    if warmup:
+        fn()
+    times = []
+    start = time.perf_counter()
+    while len(times) < max_runs and (len(times) < min_runs or time.perf_counter() - start < min_time):
+        t0 = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - t0) * 1000)
+    return {
+        "median_ms": round(statistics.median(times), 4),
+        "min_ms": round(min(times), 4),
+        "runs": len(times),
+    }
+
+
+_game = None
+
+
+def _game_at(size):
+    """Headless Game with a fresh seeded game, its display resized to ``size``."""
+    global _game
+    if _game is None:
+        import main
+
+        _game = main.Game(headless=True)
+    _game.screen = pygame.display.set_mode(size)
+    _game.targets.clear()
+    effects.clear_caches()
+    _game._start_new_game(SEED)
+    _game.ensure_world("desert")
+    _game.ensure_world("forest")
+    _game.state = "running"
+    _game.camera.update(_game.player.pos, _game.screen.get_rect())
+    return _game
+
+
+def _frame(size, rng_fill=True):
+    surf = pygame.display.set_mode(size).copy()
+    if rng_fill:
+        surf.fill((200, 170, 120))
+        for x in range(0, size[0], 37):
+            pygame.draw.line(surf, (90, 60, 40), (x, 0), (x, size[1]))
+    return surf
+
+
+# --- benchmarks: each returns the callable to time -------------------------------------
+
+
+def bench_world_init(biome):
+    return lambda: world.World(biome, SEED)
+
+
+def bench_world_draw(size):
+    w = world.World("desert", SEED)
+    surface = _frame(size, rng_fill=False)
+    camera = world.Camera(w.width, w.height)
+    camera.update(pygame.Vector2(config.PLAYER_SPAWN), surface.get_rect())
+    w.draw(surface, camera)  # fill the chunk cache: this measures steady-state frames
+    return lambda: w.draw(surface, camera)
+
+
+def bench_draw_game(size, night=False):
+    game = _game_at(size)
+    game.time_of_day = config.DAY_DURATION + 1 if night else 0.0
+    return lambda: game.draw_game(16)
+
+
+def bench_heat_haze(size):
+    surface = _frame(size)
+    ticks = iter(range(0, 10**9, 16))
+    return lambda: effects.apply_heat_haze(surface, next(ticks))
+
+
+def bench_day_night(size):
+    surface = _frame(size)
+    pos = pygame.Vector2(size[0] / 2, size[1] / 2)
+    return lambda: effects.apply_day_night(surface, pos, config.DAY_DURATION + 1, 0.7, False)
+
+
+def bench_colliding_rocks():
+    w = world.World("forest", SEED)
+    probes = [pygame.Rect(x, y, config.PLAYER_SIZE, config.PLAYER_SIZE) for x, y in _probe_points(w, 256)]
+
+    def run():
+        for rect in probes:
+            w.colliding_rocks(rect)
+
+    return run
+
+
+def _probe_points(w, count):
+    step_x = w.width // 16
+    step_y = w.height // (count // 16)
+    return [(i % 16 * step_x + 7, i // 16 * step_y + 11) for i in range(count)]
+
+
+def bench_handle_input():
+    w = world.World("forest", SEED)
+    hero = player.Player()
+
+    def run():
+        hero.pos.update(config.PLAYER_SPAWN)
+        for _ in range(100):
+            hero.handle_input(MOVE_RIGHT, 16, w)
+
+    return run
+
+
+def bench_step():
+    game = _game_at(RES_540P)
+
+    def run():
+        game.player.pos.update(config.PLAYER_SPAWN)
+        for _ in range(100):
+            game.step(16, MOVE_RIGHT)
+
+    return run
+
+
+def _save_args():
+    worlds = {"desert": world.World("desert", SEED), "forest": world.World("forest", SEED)}
+    # A converted legacy save: one generated pickup collected, one not from the seed.
+    for w in worlds.values():
+        w.pickups.remove(0)
+        w.pickups.add("water", 123.5, 456.25)
+    networks = portals.classic_networks(*portals.place_portals(pygame.Vector2(config.PLAYER_SPAWN)))
+    settings = {"speed_index": 1, "fullscreen": False, "heat_haze": True, "night_level": 1}
+    return player.Player(), worlds, "desert", networks, settings, 42.0
+
+
+def bench_save_game(tmpdir):
+    args = _save_args()
+    with overrides({"SAVE_FILE": os.path.join(tmpdir, "bench_save.dat")}):
+        saveio.save_game(*args)
+    path = os.path.join(tmpdir, "bench_save.dat")
+
+    def run():
+        with overrides({"SAVE_FILE": path}):
+            saveio.save_game(*args)
+
+    return run
+
+
+def _pickup_state(worlds: dict) -> dict:
+    return {name: sorted((p.type, p.x, p.y) for p in w.pickups) for name, w in worlds.items()}
+
+
+def bench_load_game(tmpdir):
+    path = os.path.join(tmpdir, "bench_save.dat")
+    args = _save_args()
+    with overrides({"SAVE_FILE": path}):
+        saveio.save_game(*args)
+        # Only time a load that round-trips: every remaining pickup, generated or not, comes back.
+        loaded = saveio.load_game(player.Player, portals.Portal)
+    if _pickup_state(loaded[1]) != _pickup_state(args[1]):
+        raise RuntimeError("load_game lost or changed pickups")
+
+    def run():
+        with overrides({"SAVE_FILE": path}):
+            saveio.load_game(player.Player, portals.Portal)
+
+    return run
+
+
+def suite(tmpdir):
+    """(name, scenarios, factory, timing options) for every benchmark."""
+    slow = {"min_time": 0, "min_runs": 3, "warmup": False}
+    cases = []
+    for biome in config.BIOMES:
+        cases.append((f"world_init/{biome}", ("base", "world4x", "rocks10x", "pickups5k"), lambda b=biome: bench_world_init(b), slow))
+    for size, scenarios in ((RES_540P, ("base",)), (RES_1080P, ("base", "world4x", "rocks10x", "pickups5k")), (RES_4K, ("screen4k",))):
+        res = f"{size[0]}x{size[1]}"
+        screen_only = tuple(s for s in scenarios if s in ("base", "screen4k"))
+        cases += [
+            (f"world_draw/{res}", scenarios, lambda s=size: bench_world_draw(s), {}),
+            (f"draw_game/day/{res}", scenarios, lambda s=size: bench_draw_game(s), {}),
+            (f"draw_game/night/{res}", scenarios, lambda s=size: bench_draw_game(s, night=True), {}),
+            (f"heat_haze/{res}", screen_only, lambda s=size: bench_heat_haze(s), {}),
+            (f"day_night/{res}", screen_only, lambda s=size: bench_day_night(s), {}),
+        ]
+    cases += [
+        ("colliding_rocks/x256", ("base", "world4x", "rocks10x"), bench_colliding_rocks, {}),
+        ("handle_input/x100", ("base", "world4x", "rocks10x"), bench_handle_input, {}),
+        ("step/x100", ("base", "pickups5k"), bench_step, {}),
+        ("save_game", ("base", "world4x", "pickups5k"), lambda: bench_save_game(tmpdir), {}),
+        ("load_game", ("base", "world4x", "pickups5k"), lambda: bench_load_game(tmpdir), slow),
+    ]
+    return cases
+
+
+def run(name_filter: str | None = None) -> dict:
+    results = {}
+    # Measure generation, not the disk cache; always exercise the haze path.
+    fixed = {"TEXTURE_CACHE_ENABLED": False, "HEAT_HAZE_ENABLED": True}
+    with tempfile.TemporaryDirectory() as tmpdir, overrides(fixed):
+        cases = suite(tmpdir)
+        for scenario, values in SCENARIOS.items():
+            for name, scenarios, factory, options in cases:
+                full_name = f"{scenario}/{name}"
+                if scenario not in scenarios or (name_filter and name_filter not in full_name):
+                    continue
+                with overrides(values):
+                    results[full_name] = measure(factory(), **options)
+                print(f"{full_name:45s} {results[full_name]['median_ms']:10.3f} ms", flush=True)
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "machine": platform.machine(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float, floor_ms: float = 0.05) -> list[str]:
+    """Names whose median regressed by more than ``threshold`` (ratio) and ``floor_ms``."""
+    regressions = []
+    for name, base in baseline["results"].items():
+        now = current["results"].get(name)
+        if now is None:
+            continue
+        ratio = now["median_ms"] / base["median_ms"] if base["median_ms"] else 1.0
+        slower = now["median_ms"] - base["median_ms"]
+        flag = ratio > 1 + threshold and slower > floor_ms
+        if flag:
+            regressions.append(name)
+        print(f"{name:45s} {base['median_ms']:10.3f} -> {now['median_ms']:10.3f} ms  x{ratio:5.2f}{'  REGRESSION' if flag else ''}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--out", help="write results as JSON")
+    parser.add_argument("--compare", metavar="BASELINE", help="fail if slower than this results file")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown ratio (0.25 = 25%%)")
+    parser.add_argument("--filter", help="only run benchmarks whose name contains this")
+    args = parser.parse_args()
+
+    pygame.init()
+    current = run(args.filter)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(current, f, indent=2)
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(current, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s) beyond {args.threshold:.0%}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
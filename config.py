@@ -5,13 +5,24 @@ import pygame
 # Screen settings
 SCREEN_WIDTH = 960
 SCREEN_HEIGHT = 540
-FPS = 60
+FPS = 60  # render rate cap; gameplay always steps at SIM_DT_MS
 TITLE = "Desert Portals"
 
 # World settings
 WORLD_WIDTH = 8000
 WORLD_HEIGHT = 6000
 BG_TILE = 32
+GEN_CELL = 512  # procedural generation cell side in pixels (multiple of BG_TILE)
+BG_CHUNK_SIZE = 512  # background chunk side in pixels (multiple of BG_TILE)
+BG_CHUNK_CACHE_MB = 64  # memory budget for rendered background chunks
+WORLD_MEMORY_BUDGET_MB = 96  # all worlds' backgrounds together; inactive worlds are released first
+BG_CHUNK_PREFETCH = 1  # chunks rendered ahead of the viewport per frame
+BG_USE_NUMPY = True  # vectorized chunk generation when NumPy is installed
+
+# On-disk cache of rendered background chunks
+TEXTURE_CACHE_ENABLED = True
+TEXTURE_CACHE_DIR = ".cache/textures"
+TEXTURE_CACHE_MAX_MB = 512
 
 # Player settings (pixels per second)
 PLAYER_SPEEDS = [120, 140, 180]
@@ -28,6 +39,10 @@ PORTAL_BASE_COLOR = (170, 120, 230)
 PORTAL_EDGE_COLOR = (240, 230, 255)
 PORTAL_PULSE_SPEED = 2
 PORTAL_RING_ALPHA = 130
+PORTAL_ATLAS_FRAMES = 48  # pre-rendered steps of the portal pulse (see portals.PortalAtlas)
+PORTAL_NETWORK_EXTRA = 0  # extra trap portals per world linking to other worlds (0: the classic pair only)
+PORTAL_MIN_SEPARATION = 300  # between network portals, and from the spawn
+PORTAL_GRID_CELL = 512  # spatial hash cell size for portal queries
 
 # Pickups
 PICKUP_COUNT_RANGE = (10, 20)
@@ -40,11 +55,14 @@ PICKUP_COLORS = {
 }
 PICKUP_MIN_DIST_FROM_SPAWN = 160
 PICKUP_SIZE = 12
+PICKUP_RADIUS = 12  # collection reach around the player centre
+PICKUP_GRID_CELL = 256  # spatial hash cell size for pickup queries
 
 # Camera/HUD
 HUD_COLOR = (20, 20, 20)
 HUD_TEXT_COLOR = (250, 240, 220)
 HUD_BG_ALPHA = 170
+TEXT_CACHE_SIZE = 256  # rendered text surfaces kept by render.text_cache
 
 # Heat haze effect
 HEAT_HAZE_ENABLED = True
@@ -65,6 +83,7 @@ NIGHT_COLOR = (0, 0, 0)
 DESERT_ROCK_DENSITY = 0.00008  # proportion of world area
 FOREST_ROCK_DENSITY = 0.0001
 ROCK_SIZE_RANGE = (22, 48)
+ROCK_GRID_CELL = 128  # spatial hash cell size for rock queries
 
 # Biomes
 BIOMES = {
@@ -84,11 +103,31 @@ BIOMES = {
     },
 }
 
-# Save file
-SAVE_FILE = "save.json"
+# Simulation: fixed step shared by the game loop and headless runs (simulation.py)
+SIM_DT_MS = 1000 / 60  # fixed step
+SIM_MAX_CATCHUP_STEPS = 15  # per rendered frame (250 ms); time beyond that is dropped
+SIM_MAX_STEPS = 6000
+
+# Quality governor (quality.py): render time budget per frame and how it adapts
+QUALITY_BUDGET_MS = 12.0  # draw time target, leaving room for logic and flip at 60 FPS
+QUALITY_HEADROOM = 0.55  # step quality back up when p90 draw time is below this share of the budget
+QUALITY_WINDOW = 60  # frames per decision
+DEFAULT_QUALITY = "auto"  # or a fixed level index into quality.LEVELS
+
+# Save files
+SAVE_DIR = "saves"  # slotN.dat plus index.json (metadata and thumbnails)
+SAVE_SLOTS = 3
+SAVE_THUMB_SIZE = (64, 36)
+SAVE_FILE = "save.dat"  # single save from before slots, listed in "Charger" if present
+LEGACY_SAVE_FILE = "save.json"  # older JSON saves, still loaded when no save.dat exists
 
 pygame.font.init()
 DEFAULT_FONT = pygame.font.get_default_font()
 # --- DEBUG ---
 DEBUG = True
 PORTAL_DEBUG_COLOR = (255, 0, 255)  # magenta pétant pour tests
+
+# Frame profiler (key 8: overlay, key 7: start/stop trace)
+PROFILER_WINDOW = 300  # frames in the rolling percentiles
+PROFILER_REFRESH = 0.5  # seconds between overlay text updates
+PROFILER_TRACE_FILE = "frame_trace.csv"  # .json for a JSON trace
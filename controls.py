@@ -0,0 +1,57 @@
+"""Input sources feeding Player.handle_input: live keyboard, scripted or programmatic."""
+
+import pygame
+
+
+class KeySet:
+    """Stand-in for ``pygame.key.get_pressed()`` backed by a set of key codes."""
+
+    __slots__ = ("pressed",)
+
+    def __init__(self, pressed=()):
+        self.pressed = frozenset(pressed)
+
+    def __getitem__(self, key: int) -> bool:
+        return key in self.pressed
+
+
+NO_KEYS = KeySet()
+
+
+class KeyboardInput:
+    """Reads the real keyboard state."""
+
+    def keys(self, game, dt_ms):
+        return pygame.key.get_pressed()
+
+
+class ScriptedInput:
+    """Replays ``(duration_ms, keys)`` segments in order, then releases every key."""
+
+    def __init__(self, script):
+        self.segments = [(duration, KeySet(keys)) for duration, keys in script]
+        self.index = 0
+        self.elapsed = 0.0
+
+    @property
+    def done(self) -> bool:
+        return self.index >= len(self.segments)
+
+    def keys(self, game, dt_ms):
+        while not self.done and self.elapsed >= self.segments[self.index][0]:
+            self.elapsed -= self.segments[self.index][0]
+            self.index += 1
+        if self.done:
+            return NO_KEYS
+        self.elapsed += dt_ms
+        return self.segments[self.index][1]
+
+
+class PolicyInput:
+    """Asks ``policy(game, dt_ms)`` for the keys to hold each step, e.g. for bots."""
+
+    def __init__(self, policy):
+        self.policy = policy
+
+    def keys(self, game, dt_ms):
+        return KeySet(self.policy(game, dt_ms))
@@ -3,21 +3,60 @@
 import math
 import pygame
 import config
+import render
 
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; the vignette falls back to stepped circles
+    np = None
 
-def apply_heat_haze(surface: pygame.Surface, time_ms: int) -> pygame.Surface:
-    """Apply a subtle horizontal displacement to mimic heat haze."""
-    if not config.HEAT_HAZE_ENABLED:
-        return surface
+
+_haze = {"buffer": None, "key": None, "runs": ()}
+
+
+def _haze_runs(height: int, time_ms: int):
+    """Rows grouped into (top, count, shift) runs of equal displacement for this time step."""
     amplitude = config.HEAT_HAZE_AMPLITUDE
     wavelength = config.HEAT_HAZE_WAVELENGTH
     speed = config.HEAT_HAZE_SPEED
-    width, height = surface.get_size()
-    displaced = surface.copy()
+    key = (height, time_ms, amplitude, wavelength, speed)
+    if _haze["key"] == key:
+        return _haze["runs"]
+    phase = time_ms * 0.001 * speed
+    runs = []
+    start, current = 0, None
     for y in range(height):
-        shift = int(amplitude * math.sin((y / wavelength) + time_ms * 0.001 * speed))
-        row = surface.subsurface((0, y, width, 1))
-        displaced.blit(row, (shift, y))
+        shift = int(amplitude * math.sin((y / wavelength) + phase))
+        if shift != current:
+            if current is not None:
+                runs.append((start, y - start, current))
+            start, current = y, shift
+    if current is not None:
+        runs.append((start, height - start, current))
+    _haze["key"] = key
+    _haze["runs"] = runs
+    return runs
+
+
+def apply_heat_haze(surface: pygame.Surface, time_ms: int, dest: pygame.Surface | None = None) -> pygame.Surface:
+    """Apply a subtle horizontal displacement to mimic heat haze.
+
+    The result is written to ``dest`` (same size as ``surface``), or else to a
+    persistent buffer owned by this module that is overwritten on the next call.
+    """
+    if not config.HEAT_HAZE_ENABLED:
+        return surface
+    width, height = surface.get_size()
+    displaced = dest if dest is not None else _haze["buffer"]
+    if displaced is None or displaced.get_size() != (width, height):
+        displaced = _haze["buffer"] = render.new_surface((width, height))
+    # One blit per run of equal shift; the strip uncovered by the shift keeps the original pixels.
+    for top, count, shift in _haze_runs(height, time_ms):
+        displaced.blit(surface, (shift, top), (0, top, width, count))
+        if shift > 0:
+            displaced.blit(surface, (0, top), (0, top, shift, count))
+        elif shift < 0:
+            displaced.blit(surface, (width + shift, top), (width + shift, top, -shift, count))
     return displaced
 
 
@@ -26,26 +65,79 @@ def is_night(time_of_day: float) -> bool:
     return phase >= config.DAY_DURATION
 
 
-def apply_day_night(surface: pygame.Surface, player_screen_pos: pygame.Vector2, time_of_day: float, brightness: float, has_lamp: bool):
-    """Darken the scene at night with a vignette unless lamp is active."""
+_vignette = {}
+
+
+def clear_caches():
+    """Drop cached effect buffers, e.g. after a resize or fullscreen toggle."""
+    _haze["buffer"] = None
+    _haze["key"] = None
+    _vignette.clear()
+
+
+def _vignette_disc(base_alpha: int, radius: int, fade: int) -> pygame.Surface:
+    """Square sprite: clear inside ``radius``, ramping to ``base_alpha`` over ``fade`` pixels."""
+    outer = radius + fade
+    disc = render.new_surface((outer * 2, outer * 2), alpha=True)
+    disc.fill((*config.NIGHT_COLOR, base_alpha))
+    if np is not None:
+        coords = np.arange(outer * 2) - outer + 0.5
+        distance = np.hypot(coords[:, None], coords[None, :])
+        ramp = np.clip((distance - radius) / fade, 0.0, 1.0)
+        alpha = pygame.surfarray.pixels_alpha(disc)
+        alpha[...] = (ramp * base_alpha).astype(np.uint8)
+        del alpha
+    else:
+        for step in range(0, fade, 4):
+            alpha = max(0, base_alpha - int((step / fade) * base_alpha))
+            pygame.draw.circle(disc, (*config.NIGHT_COLOR, alpha), (outer, outer), outer - step)
+        pygame.draw.circle(disc, (*config.NIGHT_COLOR, 0), (outer, outer), radius)
+    return disc
+
+
+def _vignette_layers(size, base_alpha: int, scale: float = 1.0):
+    radius = max(1, round(config.NIGHT_VISIBILITY_RADIUS * scale))
+    fade = max(1, round(config.NIGHT_FADE_WIDTH * scale))
+    key = (size, base_alpha, radius, fade)
+    layers = _vignette.get(key)
+    if layers is None:
+        _vignette.clear()
+        solid = render.new_surface(size, alpha=True)
+        solid.fill((*config.NIGHT_COLOR, base_alpha))
+        layers = _vignette[key] = (solid, _vignette_disc(base_alpha, radius, fade))
+    return layers
+
+
+def apply_day_night(
+    surface: pygame.Surface,
+    player_screen_pos: pygame.Vector2,
+    time_of_day: float,
+    brightness: float,
+    has_lamp: bool,
+    scale: float = 1.0,
+):
+    """Darken the scene at night with a vignette unless lamp is active.
+
+    ``scale`` shrinks the lit radius for canvases rendered below display resolution.
+    """
     if not is_night(time_of_day) or has_lamp:
         return surface
 
-    radius = config.NIGHT_VISIBILITY_RADIUS
-    fade = config.NIGHT_FADE_WIDTH
-    overlay = pygame.Surface(surface.get_size(), pygame.SRCALPHA)
     base_alpha = int(220 * (1.0 - brightness))
-    overlay.fill((*config.NIGHT_COLOR, base_alpha))
-
-    # radial gradient for visibility cone
-    for step in range(0, fade, 12):
-        alpha = max(0, base_alpha - int((step / fade) * base_alpha))
-        pygame.draw.circle(
-            overlay,
-            (0, 0, 0, alpha),
-            (int(player_screen_pos.x), int(player_screen_pos.y)),
-            radius + fade - step,
-        )
-    pygame.draw.circle(overlay, (0, 0, 0, 0), (int(player_screen_pos.x), int(player_screen_pos.y)), radius)
-    surface.blit(overlay, (0, 0))
+    screen = surface.get_rect()
+    solid, disc = _vignette_layers(screen.size, base_alpha, scale)
+
+    # Pre-rendered gradient around the player, flat darkness everywhere else.
+    disc_rect = disc.get_rect(center=(int(player_screen_pos.x), int(player_screen_pos.y)))
+    surface.blit(disc, disc_rect)
+    visible = disc_rect.clip(screen)
+    strips = (
+        pygame.Rect(0, 0, screen.width, visible.top),
+        pygame.Rect(0, visible.bottom, screen.width, screen.height - visible.bottom),
+        pygame.Rect(0, visible.top, visible.left, visible.height),
+        pygame.Rect(visible.right, visible.top, screen.width - visible.right, visible.height),
+    )
+    for strip in strips:
+        if strip.width > 0 and strip.height > 0:
+            surface.blit(solid, strip, strip)
     return surface
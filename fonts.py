@@ -0,0 +1,24 @@
+"""Font registry: each (face, size) is loaded from disk once and shared."""
+
+import pygame
+import config
+
+# Sizes used by the HUD, menus, loading and victory screens.
+UI_SIZES = (14, 18, 20, 24, 28, 36)
+
+_fonts: dict[tuple[str, int], pygame.font.Font] = {}
+
+
+def get(size: int, face: str | None = None) -> pygame.font.Font:
+    face = face or config.DEFAULT_FONT
+    key = (face, size)
+    font = _fonts.get(key)
+    if font is None:
+        font = _fonts[key] = pygame.font.Font(face, size)
+    return font
+
+
+def preload(sizes=UI_SIZES, face: str | None = None):
+    """Load fonts up front so opening a screen never touches the disk mid-frame."""
+    for size in sizes:
+        get(size, face)
@@ -4,35 +4,51 @@ import math
 import pygame
 import config
 import effects
+import fonts
+import render
 
 
 class HUD:
     """Draws on-screen hints, inventory, and compass."""
 
-    def __init__(self):
-        self.font = pygame.font.Font(config.DEFAULT_FONT, 18)
-        self.small_font = pygame.font.Font(config.DEFAULT_FONT, 14)
+    def __init__(self, targets: render.RenderTargets | None = None):
+        self.targets = targets or render.RenderTargets()
+        self.font = fonts.get(18)
+        self.small_font = fonts.get(14)
+        self._inventory_key = None
+        self._inventory_text = None
 
     def draw(self, surface, player, true_portal, camera, dt_ms, time_of_day):
         width, height = surface.get_size()
-        overlay = pygame.Surface((width, 70), pygame.SRCALPHA)
-        overlay.fill((*config.HUD_COLOR, config.HUD_BG_ALPHA))
+        overlay = self.targets.get("hud", (width, 70), alpha=True, fill=(*config.HUD_COLOR, config.HUD_BG_ALPHA))
         surface.blit(overlay, (0, 0))
 
         hint = "Flèches/WASD: bouger | Échap: pause"
-        text = self.font.render(hint, True, config.HUD_TEXT_COLOR)
+        text = render.text(self.font, hint, config.HUD_TEXT_COLOR)
         surface.blit(text, (10, 10))
 
-        inv_text = (
-            f"Eau: {player.inventory['water']} | Torche: {player.inventory['torch']} | "
-            f"Lampe: {'Oui' if player.inventory['lamp'] else 'Non'}"
-        )
-        inv = self.font.render(inv_text, True, config.HUD_TEXT_COLOR)
-        surface.blit(inv, (10, 36))
+        surface.blit(self._inventory_surface(player.inventory), (10, 36))
 
         self._draw_compass(surface, player, true_portal, width)
         self._draw_time_badge(surface, time_of_day)
 
+    def _inventory_surface(self, inventory):
+        key = (inventory["water"], inventory["torch"], inventory["lamp"])
+        if key != self._inventory_key:
+            inv_text = (
+                f"Eau: {inventory['water']} | Torche: {inventory['torch']} | "
+                f"Lampe: {'Oui' if inventory['lamp'] else 'Non'}"
+            )
+            self._inventory_text = render.text(self.font, inv_text, config.HUD_TEXT_COLOR)
+            self._inventory_key = key
+        return self._inventory_text
+
+    def blink_phase(self, player, true_portal):
+        """Compass blink phase (0 or 1) near the true portal, None while the needle is steady."""
+        if true_portal is None or pygame.Vector2(true_portal.pos).distance_to(player.pos) >= 40:
+            return None
+        return (pygame.time.get_ticks() // 400) % 2
+
     def _draw_compass(self, surface, player, true_portal, screen_width):
         center = (screen_width - 70, 42)
         radius = 26
@@ -46,17 +62,17 @@ class HUD:
                 center[0] + radius * 0.9 * math.cos(angle),
                 center[1] + radius * 0.9 * math.sin(angle),
             )
-            blink = direction.length() < 40 and (pygame.time.get_ticks() // 400) % 2 == 0
+            blink = self.blink_phase(player, true_portal) == 0
             color = (230, 80, 50) if blink else (255, 150, 90)
             pygame.draw.line(surface, color, center, endpoint, width=3)
             pygame.draw.circle(surface, color, (int(endpoint[0]), int(endpoint[1])), 3)
 
-        label = self.small_font.render("Nord", True, (200, 200, 190))
+        label = render.text(self.small_font, "Nord", (200, 200, 190))
         surface.blit(label, (center[0] - label.get_width() // 2, center[1] - radius - 12))
 
     def _draw_time_badge(self, surface, time_of_day: float):
         night = effects.is_night(time_of_day)
         icon_color = (255, 220, 120) if not night else (160, 200, 255)
         text = "Jour" if not night else "Nuit"
-        badge = self.small_font.render(text, True, icon_color)
+        badge = render.text(self.small_font, text, icon_color)
         surface.blit(badge, (10, 58))
@@ -0,0 +1,54 @@
+"""Background world generation on a worker thread with progress reporting."""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import world
+
+
+class WorldLoader:
+    """Queues ``World`` generation jobs keyed by (biome, seed) on one worker thread.
+
+    Jobs run in submission order, so the world needed first should be requested
+    first; later requests act as speculative prefetch.
+    """
+
+    def __init__(self):
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="worldgen")
+        self.jobs = {}
+        self.progress_by_key = {}
+
+    def request(self, biome: str, seed: int):
+        key = (biome, seed)
+        if key not in self.jobs:
+            self.progress_by_key[key] = 0.0
+            self.jobs[key] = self.executor.submit(self._generate, biome, seed)
+
+    def _generate(self, biome: str, seed: int):
+        def report(fraction):
+            self.progress_by_key[(biome, seed)] = fraction
+
+        return world.World(biome, seed, progress=report)
+
+    def progress(self, biome: str, seed: int) -> float:
+        return self.progress_by_key.get((biome, seed), 0.0)
+
+    def take(self, biome: str, seed: int, wait: bool = False):
+        """Return the generated world and forget the job, or None if still running."""
+        key = (biome, seed)
+        job = self.jobs.get(key)
+        if job is None or (not wait and not job.done()):
+            return None
+        del self.jobs[key]
+        self.progress_by_key.pop(key, None)
+        return job.result()
+
+    def reset(self):
+        """Drop all jobs; queued ones are cancelled, a running one finishes unseen."""
+        for job in self.jobs.values():
+            job.cancel()
+        self.jobs.clear()
+        self.progress_by_key.clear()
+
+    def shutdown(self):
+        self.reset()
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -1,15 +1,24 @@
 """Entry point for the Desert/Forest Portals game."""
 
+import os
 import random
 import sys
+import time
 import pygame
 
 import config
+import controls
 import effects
+import fonts
 import hud
+import loader
 import menu
 import player
 import portals
+import procgen
+import profiler
+import quality
+import render
 import saveio
 import world
 
@@ -17,7 +26,12 @@ import world
 class Game:
     """High-level game controller handling states and rendering."""
 
-    def __init__(self):
+    def __init__(self, headless: bool = False):
+        self.headless = headless
+        if headless:
+            # No window, no sound: gameplay is stepped directly by simulation.py.
+            os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+            os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
         pygame.init()
         self.screen = pygame.display.set_mode((config.SCREEN_WIDTH, config.SCREEN_HEIGHT), pygame.RESIZABLE)
         pygame.display.set_caption(config.TITLE)
@@ -30,231 +44,511 @@ class Game:
             "fullscreen": False,
             "heat_haze": config.HEAT_HAZE_ENABLED,
             "night_level": config.DEFAULT_NIGHT_LEVEL_INDEX,
+            "quality": config.DEFAULT_QUALITY,
         }
 
-        self.hud = hud.HUD()
+        fonts.preload()
+        self.targets = render.RenderTargets()
+        # Idle screens present only what changed; shown_key names what the display holds now.
+        self.dirty = render.DirtyRects()
+        self.shown_key = None
+        self.showing = None
+        self.profiler = profiler.FrameProfiler()
+        self.governor = quality.QualityGovernor()
+        self.hud = hud.HUD(self.targets)
         self.main_menu = menu.Menu(
             "Desert Portals",
             ["Nouvelle partie", "Charger", "Paramètres", "Quitter"],
+            self.targets,
         )
         self.pause_menu = menu.Menu(
             "Pause",
             ["Reprendre", "Sauvegarder", "Paramètres", "Quitter au menu"],
+            self.targets,
         )
+        self.settings_menu = menu.SettingsMenu(self.targets)
+        self.slot_menu = menu.SlotMenu(self.targets)
+        self.slot_menu_return = "menu"
+        self.snapshot = None  # last gameplay frame, the thumbnail of the next save
 
         self.portal_cooldown = 0
         self.time_of_day = 0.0
-
+        self.sim_time_ms = 0
+        self.accumulator = 0.0
+        self.input = controls.KeyboardInput()
+
+        self.loader = loader.WorldLoader()
+        self.loading_font = fonts.get(24)
+        self.victory_font = fonts.get(36)
+        self.fresh_game = False
         self._start_new_game()
 
     def _start_new_game(self, seed: int | None = None):
         self.seed = seed or random.randint(0, 999999)
-        self.worlds = {
-            "desert": world.World("desert", self.seed),
-            "forest": world.World("forest", self.seed),
-        }
+        # Desert first since play starts there; the forest is generated speculatively behind it.
+        self.loader.reset()
+        self.loader.request("desert", self.seed)
+        if not self.headless:
+            self.loader.request("forest", self.seed)
+        self.worlds = world.WorldManager()
         self.current_world = "desert"
+        self.fresh_game = True
         self.player = player.Player(speed_index=self.settings["speed_index"])
-        self.true_portal, self.trap_portal = portals.place_portals(pygame.Vector2(config.PLAYER_SPAWN))
+        self.previous_pos = pygame.Vector2(self.player.pos)
+        true_portal, trap_portal = portals.place_portals(pygame.Vector2(config.PLAYER_SPAWN))
                 # DEBUG: rapprocher les portails pour les voir tout de suite
-        if self.true_portal:
-            self.true_portal.pos.update(config.PLAYER_SPAWN[0] + 260, config.PLAYER_SPAWN[1])
-        if self.trap_portal:
-            self.trap_portal.pos.update(config.PLAYER_SPAWN[0] - 260, config.PLAYER_SPAWN[1])
+        if true_portal:
+            true_portal.pos.update(config.PLAYER_SPAWN[0] + 260, config.PLAYER_SPAWN[1])
+        if trap_portal:
+            trap_portal.pos.update(config.PLAYER_SPAWN[0] - 260, config.PLAYER_SPAWN[1])
+        # One portal network per world; extra portals are placed once the world (and its rocks) exists.
+        self.networks = portals.classic_networks(true_portal, trap_portal)
 
         self.camera = world.Camera(config.WORLD_WIDTH, config.WORLD_HEIGHT)
         self.victory = False
         self.time_of_day = 0.0
+        self.sim_time_ms = 0
+        self.accumulator = 0.0
         self.portal_cooldown = 0
 
+    @property
+    def network(self) -> portals.PortalNetwork:
+        return self.networks[self.current_world]
+
+    @property
+    def true_portal(self) -> portals.Portal | None:
+        """Nearest portal to victory in the current world (the compass target)."""
+        return self.network.nearest(self.player.pos, "real")
+
+    @property
+    def trap_portal(self) -> portals.Portal | None:
+        return self.network.nearest(self.player.pos, "trap")
+
     def _toggle_fullscreen(self):
         self.settings["fullscreen"] = not self.settings["fullscreen"]
         if self.settings["fullscreen"]:
             self.screen = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
         else:
             self.screen = pygame.display.set_mode((config.SCREEN_WIDTH, config.SCREEN_HEIGHT), pygame.RESIZABLE)
+        self._display_changed()
+
+    def _display_changed(self):
+        """Drop every cached screen-sized buffer and composed frame after the display was replaced."""
+        effects.clear_caches()
+        self.targets.clear()
+        for screen_menu in (self.main_menu, self.pause_menu, self.settings_menu, self.slot_menu):
+            screen_menu.invalidate()
+        self.shown_key = None
                 # --- DEBUG TELEPORT PORTALS ---
 
 
 
     def run(self):
+        prof = self.profiler
         while self.running:
             dt = self.clock.tick(config.FPS)
+            prof.begin_frame(dt)
             events = pygame.event.get()
             for event in events:
                 if event.type == pygame.QUIT:
                     self.running = False
                 elif event.type == pygame.VIDEORESIZE:
                     self.screen = pygame.display.set_mode(event.size, pygame.RESIZABLE)
-                        # --- DEBUG: touches 8/9/0 (pas besoin de Fn sur Mac) ---
+                    self._display_changed()
+                        # --- DEBUG: touches 7/8/9/0 (pas besoin de Fn sur Mac) ---
                 elif event.type == pygame.KEYDOWN:
-                    # 8 : afficher positions dans le Terminal
-                    if event.key == pygame.K_8 and self.true_portal and self.trap_portal:
-                        print("Player:", int(self.player.pos.x), int(self.player.pos.y))
-                        print("Portal A (real):", int(self.true_portal.pos.x), int(self.true_portal.pos.y))
-                        print("Portal B (trap):", int(self.trap_portal.pos.x), int(self.trap_portal.pos.y))
-                
+                    # 8 : afficher/masquer le profileur (temps par étape, positions)
+                    if event.key == pygame.K_8:
+                        prof.toggle_overlay()
+
+                    # 7 : démarrer/arrêter l'enregistrement d'une trace par frame
+                    elif event.key == pygame.K_7:
+                        prof.toggle_trace()
+
                     # 9 : téléporter près du portail réel
                     elif event.key == pygame.K_9 and self.true_portal:
                         self.player.pos.update(self.true_portal.pos.x + 40, self.true_portal.pos.y)
+                        self.previous_pos.update(self.player.pos)
                 
                     # 0 : téléporter près du portail piège
                     elif event.key == pygame.K_0 and self.trap_portal:
                         self.player.pos.update(self.trap_portal.pos.x + 40, self.trap_portal.pos.y)
+                        self.previous_pos.update(self.player.pos)
+            prof.mark("events")
 
-
-            if self.state == "menu":
+            state = self.state
+            self.showing = None
+            if state == "menu":
                 self.handle_main_menu(events)
-            elif self.state == "running":
+            elif state == "loading":
+                self.update_loading(events)
+            elif state == "running":
                 self.update_gameplay(dt, events)
-            elif self.state == "paused":
+            elif state == "paused":
                 self.handle_pause_menu(events)
-            elif self.state == "victory":
+            elif state == "slots":
+                self.handle_slot_menu(events)
+            elif state == "victory":
                 self.draw_victory(events)
-            pygame.display.flip()
+            # Screens other than gameplay are timed as a single stage named after the state.
+            prof.mark(state)
+            if prof.overlay:
+                prof.extra_lines = self._debug_lines()
+                prof.draw(self.screen)
+                prof.mark("overlay")
+                self.dirty.invalidate()
+                self.showing = None
+            self.dirty.present()
+            self.shown_key = self.showing
+            prof.mark("flip")
+            self.targets.end_frame()
+            prof.end_frame(self.targets.frame_allocations)
+        prof.stop_trace()
+        self.loader.shutdown()
         pygame.quit()
         sys.exit()
 
+    def _debug_lines(self):
+        lines = [f"Surfaces/frame: {self.targets.frame_allocations}", f"Player: {int(self.player.pos.x)} {int(self.player.pos.y)}"]
+        if self.true_portal:
+            lines.append(f"Portal A (real): {int(self.true_portal.pos.x)} {int(self.true_portal.pos.y)}")
+        if self.trap_portal:
+            lines.append(f"Portal B (trap): {int(self.trap_portal.pos.x)} {int(self.trap_portal.pos.y)}")
+        return lines
+
+    def _show(self, frame: pygame.Surface, key):
+        """Put a composed full-screen ``frame`` on the display unless it is already there."""
+        self.showing = key
+        if key == self.shown_key:
+            self.dirty.partial()
+        else:
+            self.screen.blit(frame, (0, 0))
+
     def handle_main_menu(self, events):
         choice = self.main_menu.update(events)
         if choice == 0:
-            self._start_new_game()
-            self.state = "running"
+            # Reuse the game generated in the background while the menu was open.
+            if not self.fresh_game:
+                self._start_new_game()
+            self.state = "loading"
         elif choice == 1:
-            loaded = saveio.load_game(player.Player, portals.Portal)
-            if loaded:
-                (
-                    self.player,
-                    self.worlds,
-                    (self.true_portal, self.trap_portal),
-                    settings,
-                    current_world,
-                    self.time_of_day,
-                ) = loaded
-                self.settings.update(settings)
-                for key, default in [
-                    ("speed_index", config.DEFAULT_SPEED_INDEX),
-                    ("fullscreen", False),
-                    ("heat_haze", config.HEAT_HAZE_ENABLED),
-                    ("night_level", config.DEFAULT_NIGHT_LEVEL_INDEX),
-                ]:
-                    if key not in self.settings:
-                        self.settings[key] = default
-                self.current_world = current_world
-                config.HEAT_HAZE_ENABLED = self.settings.get("heat_haze", config.HEAT_HAZE_ENABLED)
-                self.player.speed_index = self.settings.get("speed_index", self.player.speed_index)
-                self.state = "running"
+            self._open_slot_menu("load")
         elif choice == 2:
             self.state = "settings"
         elif choice == 3:
             self.running = False
 
-        self.screen.fill((0, 0, 0))
-        self.main_menu.draw(self.screen)
+        frame = self.main_menu.frame(self.screen.get_size())
+        self._show(frame, ("menu", self.main_menu.frame_key))
         if self.state == "settings":
             self._open_settings_menu()
             self.state = "menu"
 
+    def _open_slot_menu(self, mode: str):
+        self.slot_menu_return = self.state
+        self.slot_menu.open(mode)
+        self.state = "slots"
+
+    def handle_slot_menu(self, events):
+        choice = self.slot_menu.update(events)
+        if choice == "back":
+            self.state = self.slot_menu_return
+        elif choice is not None and self.slot_menu.mode == "save":
+            saveio.save_slot(
+                choice,
+                self.snapshot,
+                self.player,
+                self.worlds,
+                self.current_world,
+                self.networks,
+                self.settings,
+                self.time_of_day,
+            )
+            self.state = "running"
+        elif choice is not None:
+            if choice == "legacy":
+                loaded = saveio.load_game(player.Player, portals.Portal, saveio.legacy_save_path())
+            else:
+                loaded = saveio.load_slot(choice, player.Player, portals.Portal)
+            if loaded:
+                self._apply_loaded(loaded)
+                self.state = "running"
+
+        frame = self.slot_menu.frame(self.screen.get_size())
+        self._show(frame, ("slots", self.slot_menu.frame_key))
+
+    def _apply_loaded(self, loaded):
+        (
+            self.player,
+            self.worlds,
+            self.networks,
+            settings,
+            current_world,
+            self.time_of_day,
+        ) = loaded
+        self.worlds = world.WorldManager(self.worlds)
+        self.settings.update(settings)
+        for key, default in [
+            ("speed_index", config.DEFAULT_SPEED_INDEX),
+            ("fullscreen", False),
+            ("heat_haze", config.HEAT_HAZE_ENABLED),
+            ("night_level", config.DEFAULT_NIGHT_LEVEL_INDEX),
+            ("quality", config.DEFAULT_QUALITY),
+        ]:
+            if key not in self.settings:
+                self.settings[key] = default
+        self.current_world = current_world
+        self.previous_pos = pygame.Vector2(self.player.pos)
+        self.accumulator = 0.0
+        self.seed = self.worlds[current_world].seed
+        self.loader.reset()
+        self.fresh_game = False
+        config.HEAT_HAZE_ENABLED = self.settings.get("heat_haze", config.HEAT_HAZE_ENABLED)
+        self.player.speed_index = self.settings.get("speed_index", self.player.speed_index)
+
     def _open_settings_menu(self):
-        self.settings["open"] = True
-        while self.settings.get("open"):
+        self.settings_menu.open()
+        shown = None
+        while self.settings_menu.is_open:
             events = pygame.event.get()
-            self.screen.fill((0, 0, 0))
-            self.settings = menu.settings_menu(self.screen, self.settings, events)
-            pygame.display.flip()
+            self.settings_menu.update(self.settings, events)
+            frame = self.settings_menu.frame(self.screen.get_size(), self.settings)
+            # Nothing to present until a choice changes the composed frame.
+            if self.settings_menu.frame_key != shown:
+                self.screen.blit(frame, (0, 0))
+                pygame.display.flip()
+                shown = self.settings_menu.frame_key
             self.clock.tick(30)
             config.HEAT_HAZE_ENABLED = self.settings["heat_haze"]
             self.player.speed_index = self.settings["speed_index"]
             if self.settings["fullscreen"] != pygame.display.is_fullscreen():
                 self._toggle_fullscreen()
+        self.shown_key = self.showing = None
+
+    def _poll_worlds(self):
+        for biome in config.BIOMES:
+            if biome not in self.worlds:
+                generated = self.loader.take(biome, self.seed)
+                if generated is not None:
+                    self._add_world(generated)
+
+    def _add_world(self, generated: world.World):
+        self.worlds[generated.biome] = generated
+        network = self.networks[generated.biome]
+        if not network.extras_placed:
+            rng = procgen.cell_rng(self.seed, generated.biome, "portals")
+            portals.place_network(network, generated, config.PORTAL_NETWORK_EXTRA, rng)
+
+    def update_loading(self, events):
+        self._poll_worlds()
+        if self.current_world in self.worlds:
+            self.fresh_game = False
+            self._enter_world()
+            self.state = "running"
+            return
+        self.loader.request(self.current_world, self.seed)
+        progress = self.loader.progress(self.current_world, self.seed)
+
+        width, height = self.screen.get_size()
+        self.showing = ("loading", (width, height), int(progress * 100))
+        if self.showing == self.shown_key:
+            self.dirty.partial()
+            return
+        self.screen.fill((0, 0, 0))
+        label = render.text(self.loading_font, f"Génération du monde… {int(progress * 100)}%", config.HUD_TEXT_COLOR)
+        self.screen.blit(label, label.get_rect(center=(width // 2, height // 2 - 20)))
+        bar = pygame.Rect(0, 0, width // 3, 12)
+        bar.center = (width // 2, height // 2 + 20)
+        pygame.draw.rect(self.screen, (80, 70, 60), bar)
+        pygame.draw.rect(self.screen, (230, 200, 140), (bar.x, bar.y, int(bar.width * progress), bar.height))
+
+    def ensure_world(self, name: str):
+        """Block until world ``name`` is generated (headless runs have no loading screen)."""
+        self._poll_worlds()
+        if name not in self.worlds:
+            self.loader.request(name, self.seed)
+            self._add_world(self.loader.take(name, self.seed, wait=True))
 
     def update_gameplay(self, dt, events):
-        keys = pygame.key.get_pressed()
+        self._poll_worlds()
+        keys = self.input.keys(self, dt)
         if keys[pygame.K_ESCAPE]:
+            # The screen still holds the last gameplay frame: keep it for the save thumbnail.
+            self.snapshot = pygame.transform.smoothscale(self.screen, config.SAVE_THUMB_SIZE)
+            render.note_allocation()
             self.state = "paused"
             return
+        # Fixed-timestep accumulator: gameplay advances in SIM_DT_MS steps whatever the frame rate.
+        # After a long frame at most SIM_MAX_CATCHUP_STEPS are replayed; the rest is dropped.
+        step_ms = config.SIM_DT_MS
+        self.accumulator = min(self.accumulator + dt, step_ms * config.SIM_MAX_CATCHUP_STEPS)
+        while self.accumulator >= step_ms and self.state == "running":
+            self.previous_pos.update(self.player.pos)
+            self.step(step_ms, keys)
+            self.accumulator -= step_ms
+        self.profiler.mark("update")
+        if self.state == "loading":
+            return
+        started = time.perf_counter()
+        self.draw_game(dt)
+        self.governor.update((time.perf_counter() - started) * 1000, self.settings["quality"])
+
+    def step(self, dt, keys):
+        """Advance gameplay logic by ``dt`` ms with the given key state; no rendering."""
         current = self.worlds[self.current_world]
         self.player.handle_input(keys, dt, current)
-        self.camera.update(self.player.pos, self.screen.get_rect())
-        pickup = current.remove_pickup_at(self.player.pos)
-        self.player.collect(pickup)
-
-        now = pygame.time.get_ticks()
-        if now > self.portal_cooldown:
-            if self.true_portal and self.true_portal.collides_with(self.player.rect):
+        for pickup in current.collect_pickups(self.player.pos):
+            self.player.collect(pickup)
+
+        self.sim_time_ms += dt
+        if self.sim_time_ms > self.portal_cooldown:
+            # Indexed lookup: the cost does not grow with the number of portals.
+            portal = self.network.colliding(self.player.rect)
+            if portal and portal.kind == "real":
                 self.victory = True
                 self.state = "victory"
-            elif self.trap_portal and self.trap_portal.collides_with(self.player.rect):
-                self._toggle_world()
-                self.portal_cooldown = now + 800
+            elif portal:
+                self._travel(portal.destination or portals.next_world(self.current_world))
+                self.portal_cooldown = self.sim_time_ms + 800
 
         self.time_of_day += dt / 1000.0
-        self.draw_game(dt)
 
-    def _toggle_world(self):
-        self.current_world = "forest" if self.current_world == "desert" else "desert"
+    def _travel(self, destination: str):
+        self.current_world = destination
+        if self.current_world in self.worlds:
+            self._enter_world()
+        else:
+            # Not generated yet: wait on the loading screen, then enter it.
+            self.state = "loading"
+
+    def _enter_world(self):
         # Avoid being stuck inside a rock after switching
         if self.worlds[self.current_world].colliding_rocks(self.player.rect):
             self.player.pos = pygame.Vector2(config.PLAYER_SPAWN)
             self.player._update_rect()
+            self.previous_pos.update(self.player.pos)
 
     def handle_pause_menu(self, events):
         choice = self.pause_menu.update(events)
         if choice == 0:
             self.state = "running"
         elif choice == 1:
-            saveio.save_game(
-                self.player,
-                self.worlds,
-                self.current_world,
-                (self.true_portal, self.trap_portal),
-                self.settings,
-                self.time_of_day,
-            )
-            self.state = "running"
+            self._open_slot_menu("save")
         elif choice == 2:
             self._open_settings_menu()
             self.state = "paused"
         elif choice == 3:
             self.state = "menu"
 
-        self.screen.fill((0, 0, 0))
-        self.pause_menu.draw(self.screen)
+        frame = self.pause_menu.frame(self.screen.get_size())
+        self._show(frame, ("paused", self.pause_menu.frame_key))
 
     def draw_game(self, dt):
-        canvas = pygame.Surface(self.screen.get_size())
+        level = self.governor.current
+        scale = level["scale"]
+        display = self.screen
+        size = display.get_size()
+        internal = (round(size[0] * scale), round(size[1] * scale))
+        # Render between the last two simulation steps, by the fraction of a step left over.
+        alpha = min(1.0, self.accumulator / config.SIM_DT_MS)
+        view_pos = self.previous_pos.lerp(self.player.pos, alpha)
+        self.camera.scale = scale
+        self.camera.update(view_pos, pygame.Rect((0, 0), internal))
+        haze = config.HEAT_HAZE_ENABLED and level["haze"] and self.current_world == "desert"
+        # Haze and reduced internal resolution need a separate canvas; otherwise draw straight to the display.
+        canvas = self.targets.get("canvas", internal) if haze or scale != 1.0 else display
+        # The world on screen is the last to give up memory (see WorldManager).
+        self.worlds.activate(self.current_world)
         current = self.worlds[self.current_world]
+        brightness = config.NIGHT_LEVELS[self.settings.get("night_level", config.DEFAULT_NIGHT_LEVEL_INDEX)]
+        lamp = self.player.inventory.get("lamp", False)
+
+        # Everything on screen except the portals' pulse. While it holds, only the portals are redrawn.
+        self.showing = (
+            "running",
+            size,
+            self.current_world,
+            tuple(self.camera.offset),
+            tuple(view_pos),
+            scale,
+            haze,
+            len(current.pickups),
+            tuple(self.player.inventory.values()),
+            effects.is_night(self.time_of_day),
+            brightness,
+            self.hud.blink_phase(self.player, self.true_portal),
+        )
+        args = (canvas, current, view_pos, brightness, lamp, haze, dt)
+        if canvas is display and self.showing == self.shown_key:
+            rects = self._portal_rects(display.get_rect())
+            for rect in rects:
+                display.set_clip(rect)
+                self._draw_scene(*args)
+            display.set_clip(None)
+            self.dirty.partial(rects)
+            return
+        self._draw_scene(*args)
+
+    def _portal_rects(self, screen: pygame.Rect) -> list[pygame.Rect]:
+        """Screen areas the portals can touch whatever their pulse."""
+        rects = []
+        for portal in self._visible_portals():
+            rect = portal.screen_rect(self.camera).clip(screen)
+            if rect.width and rect.height:
+                rects.append(rect)
+        return rects
+
+    def _visible_portals(self) -> list[portals.Portal]:
+        reach = 2 * (config.PORTAL_RADIUS + 20)
+        view = pygame.Rect(self.camera.offset, self.screen.get_size()).inflate(reach, reach)
+        return self.network.in_rect(view)
+
+    def _draw_scene(self, canvas, current, view_pos, brightness, lamp, haze, dt):
+        prof = self.profiler
+        display = self.screen
+        scale = self.camera.scale
         current.draw(canvas, self.camera)
-        if self.true_portal:
-            self.true_portal.draw(canvas, self.camera, pygame.time.get_ticks())
-        if self.trap_portal:
-            self.trap_portal.draw(canvas, self.camera, pygame.time.get_ticks())
-        self.player.draw(canvas, self.camera)
-        self.hud.draw(canvas, self.player, self.true_portal, self.camera, dt, self.time_of_day)
+        prof.mark("world")
+        ticks = pygame.time.get_ticks()
+        for portal in self._visible_portals():
+            portal.draw(canvas, self.camera, ticks)
+        prof.mark("portals")
+        self.player.draw(canvas, self.camera, view_pos)
+        prof.mark("player")
 
-        brightness = config.NIGHT_LEVELS[self.settings.get("night_level", config.DEFAULT_NIGHT_LEVEL_INDEX)]
         player_screen_pos = pygame.Vector2(
-            self.player.pos.x - self.camera.offset.x,
-            self.player.pos.y - self.camera.offset.y,
+            (view_pos.x - self.camera.offset.x) * scale,
+            (view_pos.y - self.camera.offset.y) * scale,
         )
-        canvas = effects.apply_day_night(canvas, player_screen_pos, self.time_of_day, brightness, self.player.inventory.get("lamp", False))
+        canvas = effects.apply_day_night(canvas, player_screen_pos, self.time_of_day, brightness, lamp, scale)
+        prof.mark("day_night")
 
-        if config.HEAT_HAZE_ENABLED and self.current_world == "desert":
-            canvas = effects.apply_heat_haze(canvas, pygame.time.get_ticks())
-        self.screen.blit(canvas, (0, 0))
+        if haze:
+            effects.apply_heat_haze(canvas, pygame.time.get_ticks(), dest=display)
+            prof.mark("haze")
+        elif canvas is not display:
+            pygame.transform.scale(canvas, display.get_size(), display)
+            prof.mark("upscale")
+
+        # The HUD is drawn last, at display resolution, unaffected by night and haze.
+        self.hud.draw(display, self.player, self.true_portal, self.camera, dt, self.time_of_day)
+        prof.mark("hud")
 
     def draw_victory(self, events):
         for event in events:
             if event.type == pygame.KEYDOWN and event.key in (pygame.K_RETURN, pygame.K_SPACE):
                 self._start_new_game(self.seed)
-                self.state = "running"
+                self.state = "loading"
             elif event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
                 self.state = "menu"
-        overlay = pygame.Surface(self.screen.get_size(), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 180))
+        # Darken the final gameplay frame once; blending every frame would stack the overlay.
+        self.showing = ("victory", self.screen.get_size())
+        if self.showing == self.shown_key:
+            self.dirty.partial()
+            return
+        overlay = self.targets.get("victory", self.screen.get_size(), alpha=True, fill=(0, 0, 0, 180))
         self.screen.blit(overlay, (0, 0))
-        font = pygame.font.Font(config.DEFAULT_FONT, 36)
-        text = font.render("Victoire! Entrée pour recommencer", True, (255, 255, 255))
+        text = render.text(self.victory_font, "Victoire! Entrée pour recommencer", (255, 255, 255))
         rect = text.get_rect(center=self.screen.get_rect().center)
         self.screen.blit(text, rect)
 
@@ -1,18 +1,41 @@
-"""Menu system for main, pause, and settings screens."""
+"""Menu system for main, pause, settings and save-slot screens."""
 
+import time
 import pygame
 import config
+import fonts
+import quality
+import render
+import saveio
 
 
 class Menu:
     """Simple vertical menu navigable via keyboard."""
 
-    def __init__(self, title: str, options: list[str]):
+    def __init__(self, title: str, options: list[str], targets: render.RenderTargets | None = None):
+        self.targets = targets or render.RenderTargets()
         self.title = title
         self.options = options
         self.index = 0
-        self.font = pygame.font.Font(config.DEFAULT_FONT, 28)
-        self.small_font = pygame.font.Font(config.DEFAULT_FONT, 20)
+        self.font = fonts.get(28)
+        self.small_font = fonts.get(20)
+        self.frame_key = None
+
+    def frame(self, size) -> pygame.Surface:
+        """The whole menu screen on black, re-composed only when it changed (e.g. on navigation)."""
+        name = f"frame:{self.title}"
+        surface = self.targets.get(name, size)
+        # A recreated target (resize, fullscreen toggle) starts out black: its serial is part of the key.
+        key = (tuple(size), self.index, tuple(self.options), self.targets.serial(name))
+        if key != self.frame_key:
+            surface.fill((0, 0, 0))
+            self.draw(surface)
+            self.frame_key = key
+        return surface
+
+    def invalidate(self):
+        """Compose the next frame afresh, e.g. after the render targets were cleared."""
+        self.frame_key = None
 
     def update(self, events):
         for event in events:
@@ -27,55 +50,176 @@ class Menu:
 
     def draw(self, surface: pygame.Surface):
         width, height = surface.get_size()
-        overlay = pygame.Surface((width, height), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 140))
+        overlay = self.targets.get("menu", (width, height), alpha=True, fill=(0, 0, 0, 140))
         surface.blit(overlay, (0, 0))
 
-        title_surf = self.font.render(self.title, True, (240, 230, 210))
+        title_surf = render.text(self.font, self.title, (240, 230, 210))
         surface.blit(title_surf, (width // 2 - title_surf.get_width() // 2, height // 4))
 
         for i, option in enumerate(self.options):
             color = (255, 255, 255) if i == self.index else (180, 170, 150)
-            text = self.small_font.render(option, True, color)
+            text = render.text(self.small_font, option, color)
             surface.blit(text, (width // 2 - text.get_width() // 2, height // 2 + i * 32))
 
 
-def settings_menu(surface, current_state, events):
-    """Handle settings update and rendering."""
-    menu = Menu("Paramètres", ["Vitesse", "Plein écran", "Heat haze", "Luminosité nuit", "Retour"])
-    menu.index = current_state.get("index", 0)
-
-    choice = menu.update(events)
-    if choice is not None:
-        menu.index = choice
-    menu.draw(surface)
-
-    width, height = surface.get_size()
-    font = pygame.font.Font(config.DEFAULT_FONT, 20)
-    info = [
-        f"Vitesse: {config.PLAYER_SPEEDS[current_state['speed_index']]} px/s",
-        f"Plein écran: {'Oui' if current_state['fullscreen'] else 'Non'}",
-        f"Heat haze: {'On' if current_state['heat_haze'] else 'Off'}",
-        f"Nuit: niveau {current_state['night_level'] + 1}/{len(config.NIGHT_LEVELS)}",
-    ]
-    for i, line in enumerate(info):
-        text = font.render(line, True, (230, 220, 200))
-        surface.blit(text, (width // 2 - text.get_width() // 2, height // 2 + i * 32 + 80))
-
-    for event in events:
-        if event.type == pygame.KEYDOWN:
-            if event.key in (pygame.K_RETURN, pygame.K_SPACE):
-                if menu.index == 0:
-                    current_state["speed_index"] = (current_state["speed_index"] + 1) % len(config.PLAYER_SPEEDS)
-                elif menu.index == 1:
-                    current_state["fullscreen"] = not current_state["fullscreen"]
-                elif menu.index == 2:
-                    current_state["heat_haze"] = not current_state["heat_haze"]
-                elif menu.index == 3:
-                    current_state["night_level"] = (current_state["night_level"] + 1) % len(config.NIGHT_LEVELS)
-                elif menu.index == 4:
-                    current_state["open"] = False
+class SettingsMenu:
+    """Settings screen that lives across frames and edits the game's settings dict in place."""
+
+    OPTIONS = ["Vitesse", "Plein écran", "Heat haze", "Luminosité nuit", "Qualité", "Retour"]
+
+    def __init__(self, targets: render.RenderTargets | None = None):
+        self.menu = Menu("Paramètres", list(self.OPTIONS), targets)
+        self.is_open = False
+
+    def open(self):
+        self.is_open = True
+
+    def update(self, settings: dict, events):
+        choice = self.menu.update(events)
+        if choice == 0:
+            settings["speed_index"] = (settings["speed_index"] + 1) % len(config.PLAYER_SPEEDS)
+        elif choice == 1:
+            settings["fullscreen"] = not settings["fullscreen"]
+        elif choice == 2:
+            settings["heat_haze"] = not settings["heat_haze"]
+        elif choice == 3:
+            settings["night_level"] = (settings["night_level"] + 1) % len(config.NIGHT_LEVELS)
+        elif choice == 4:
+            modes = quality.MODES
+            settings["quality"] = modes[(modes.index(settings["quality"]) + 1) % len(modes)]
+        elif choice == 5:
+            self.is_open = False
+        for event in events:
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+                self.is_open = False
+
+    @property
+    def frame_key(self):
+        return self.menu.frame_key
+
+    def invalidate(self):
+        self.menu.invalidate()
+
+    def frame(self, size, settings: dict) -> pygame.Surface:
+        self._label_options(settings)
+        return self.menu.frame(size)
+
+    def draw(self, surface: pygame.Surface, settings: dict):
+        self._label_options(settings)
+        self.menu.draw(surface)
+
+    def _label_options(self, settings: dict):
+        # Values sit next to their option rather than in a second list that overlapped the first.
+        values = [
+            f"{config.PLAYER_SPEEDS[settings['speed_index']]} px/s",
+            "Oui" if settings["fullscreen"] else "Non",
+            "On" if settings["heat_haze"] else "Off",
+            f"niveau {settings['night_level'] + 1}/{len(config.NIGHT_LEVELS)}",
+            quality.mode_label(settings["quality"]),
+        ]
+        self.menu.options = [f"{name}: {value}" for name, value in zip(self.OPTIONS, values)] + self.OPTIONS[len(values):]
+
+
+class SlotMenu:
+    """Save-slot picker for loading or saving; it reads the slot index only, never the saves."""
+
+    WORLD_NAMES = {"desert": "Désert", "forest": "Forêt"}
+
+    def __init__(self, targets: render.RenderTargets | None = None):
+        self.targets = targets or render.RenderTargets()
+        self.font = fonts.get(28)
+        self.small_font = fonts.get(20)
+        self.info_font = fonts.get(14)
+        self.mode = "load"
+        self.index = 0
+        self.entries = []  # (label, slot number / "legacy" / None for back, metadata)
+        self.thumbnails = {}
+        self.frame_key = None
+        self._opened = 0
+
+    def open(self, mode: str):
+        """Re-read the index; ``mode`` is "load" or "save"."""
+        self.mode = mode
+        self.index = 0
+        index = saveio.read_index()
+        self.entries = [(f"Emplacement {slot}", slot, index.get(slot)) for slot in range(1, config.SAVE_SLOTS + 1)]
+        if mode == "load" and saveio.legacy_save_path():
+            self.entries.append(("Ancienne sauvegarde", "legacy", None))
+        self.entries.append(("Retour", None, None))
+        self.thumbnails = {slot: saveio.thumbnail_surface(meta) for _, slot, meta in self.entries if meta}
+        self._opened += 1  # the index may have changed: compose a fresh frame
+
+    def frame(self, size) -> pygame.Surface:
+        surface = self.targets.get("frame:slots", size)
+        key = (tuple(size), self.mode, self.index, self._opened, self.targets.serial("frame:slots"))
+        if key != self.frame_key:
+            surface.fill((0, 0, 0))
+            self.draw(surface)
+            self.frame_key = key
+        return surface
+
+    def invalidate(self):
+        self.frame_key = None
+
+    def update(self, events):
+        """The chosen slot (or "legacy"), "back" to leave, or None while choosing."""
+        for event in events:
+            if event.type != pygame.KEYDOWN:
+                continue
+            if event.key in (pygame.K_DOWN, pygame.K_s):
+                self.index = (self.index + 1) % len(self.entries)
+            elif event.key in (pygame.K_UP, pygame.K_w):
+                self.index = (self.index - 1) % len(self.entries)
             elif event.key == pygame.K_ESCAPE:
-                current_state["open"] = False
-    current_state["index"] = menu.index
-    return current_state
+                return "back"
+            elif event.key in (pygame.K_RETURN, pygame.K_SPACE):
+                _, slot, meta = self.entries[self.index]
+                if slot is None:
+                    return "back"
+                # Empty slots can be written but not loaded.
+                if self.mode == "save" or meta or slot == "legacy":
+                    return slot
+        return None
+
+    def describe(self, meta: dict | None) -> str:
+        if not meta:
+            return "vide"
+        minutes, seconds = divmod(int(meta.get("play_time", 0)), 60)
+        parts = [
+            time.strftime("%d/%m/%Y %H:%M", time.localtime(meta.get("timestamp", 0))),
+            self.WORLD_NAMES.get(meta.get("world"), meta.get("world", "?")),
+            f"{minutes}:{seconds:02d}",
+        ]
+        inventory = meta.get("inventory", {})
+        parts.append(f"eau {inventory.get('water', 0)}, torche {inventory.get('torch', 0)}")
+        if inventory.get("lamp"):
+            parts.append("lampe")
+        return " · ".join(parts)
+
+    def draw(self, surface: pygame.Surface):
+        width, height = surface.get_size()
+        overlay = self.targets.get("menu", (width, height), alpha=True, fill=(0, 0, 0, 140))
+        surface.blit(overlay, (0, 0))
+
+        title = "Sauvegarder" if self.mode == "save" else "Charger"
+        title_surf = render.text(self.font, title, (240, 230, 210))
+        surface.blit(title_surf, (width // 2 - title_surf.get_width() // 2, height // 5))
+
+        thumb_w, thumb_h = config.SAVE_THUMB_SIZE
+        row_h = thumb_h + 14
+        left = width // 2 - 220
+        top = height // 5 + 60
+        for i, (label, slot, meta) in enumerate(self.entries):
+            y = top + i * row_h
+            color = (255, 255, 255) if i == self.index else (180, 170, 150)
+            if slot is not None:
+                frame = pygame.Rect(left, y, thumb_w, thumb_h)
+                thumb = self.thumbnails.get(slot)
+                if thumb is not None:
+                    surface.blit(thumb, frame)
+                pygame.draw.rect(surface, color, frame.inflate(2, 2), 1)
+            text = render.text(self.small_font, label, color)
+            surface.blit(text, (left + thumb_w + 16, y))
+            if slot is not None and slot != "legacy":
+                info = render.text(self.info_font, self.describe(meta), (230, 220, 200))
+                surface.blit(info, (left + thumb_w + 16, y + 22))
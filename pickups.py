@@ -0,0 +1,119 @@
+"""Array-backed pickup storage with a grid index for radius and view queries."""
+
+from array import array
+
+import pygame
+import config
+import spatial
+
+# Pickup types are stored as indices into this tuple.
+TYPES = tuple(config.PICKUP_COLORS)
+_TYPE_INDEX = {ptype: i for i, ptype in enumerate(TYPES)}
+
+
+class Pickup:
+    """A pickup handed out by queries; the store itself keeps only flat arrays."""
+
+    __slots__ = ("id", "type", "x", "y")
+
+    def __init__(self, pickup_id: int, ptype: str, x: float, y: float):
+        self.id = pickup_id
+        self.type = ptype
+        self.x = x
+        self.y = y
+
+    @property
+    def pos(self) -> pygame.Vector2:
+        return pygame.Vector2(self.x, self.y)
+
+
+class PickupStore:
+    """The pickups of one world, addressed by id.
+
+    Generated pickups come first (ids ``0 .. total - 1``, the ids of save
+    bitsets), then any extras. Collecting a pickup clears its ``alive`` flag and
+    drops it from the grid; ids are never reused. The grid is built on the
+    first query, so worlds that are only loaded and saved never pay for it.
+    """
+
+    def __init__(self, cell_size: int = config.PICKUP_GRID_CELL):
+        self.types = bytearray()
+        self.xs = array("d")
+        self.ys = array("d")
+        self.alive = bytearray()
+        self.count = 0
+        self.cell_size = cell_size
+        self._grid = None
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __iter__(self):
+        for pickup_id, alive in enumerate(self.alive):
+            if alive:
+                yield self.get(pickup_id)
+
+    @property
+    def grid(self) -> spatial.SpatialHash:
+        if self._grid is None:
+            self._grid = spatial.SpatialHash(self.cell_size)
+            insert, xs, ys = self._grid.insert_point, self.xs, self.ys
+            for pickup_id, alive in enumerate(self.alive):
+                if alive:
+                    insert(pickup_id, xs[pickup_id], ys[pickup_id])
+        return self._grid
+
+    def add(self, ptype: str, x: float, y: float) -> int:
+        pickup_id = len(self.types)
+        self.types.append(_TYPE_INDEX[ptype])
+        self.xs.append(x)
+        self.ys.append(y)
+        self.alive.append(1)
+        self.count += 1
+        if self._grid is not None:
+            self._grid.insert_point(pickup_id, x, y)
+        return pickup_id
+
+    def get(self, pickup_id: int) -> Pickup:
+        return Pickup(pickup_id, TYPES[self.types[pickup_id]], self.xs[pickup_id], self.ys[pickup_id])
+
+    def remove(self, pickup_id: int):
+        if self.alive[pickup_id]:
+            self.alive[pickup_id] = 0
+            self.count -= 1
+            if self._grid is not None:
+                self._grid.remove_point(pickup_id, self.xs[pickup_id], self.ys[pickup_id])
+
+    def in_rect(self, rect: pygame.Rect) -> list[Pickup]:
+        """Remaining pickups whose position lies in ``rect``, by id."""
+        xs, ys = self.xs, self.ys
+        return [self.get(i) for i in self.grid.candidates(rect) if rect.collidepoint(xs[i], ys[i])]
+
+    def collect_radius(self, x: float, y: float, radius: float) -> list[Pickup]:
+        """Remove and return every pickup within ``radius`` of ``(x, y)``, by id."""
+        reach = int(radius) + 1
+        area = pygame.Rect(int(x) - reach, int(y) - reach, 2 * reach + 1, 2 * reach + 1)
+        xs, ys = self.xs, self.ys
+        limit = radius * radius
+        found = []
+        for i in self.grid.candidates(area):
+            dx = xs[i] - x
+            dy = ys[i] - y
+            if dx * dx + dy * dy <= limit:
+                found.append(self.get(i))
+                self.remove(i)
+        return found
+
+    def collected_bits(self, total: int) -> bytes:
+        """Bitset over ids ``0 .. total - 1``: bit ``i`` is set once pickup ``i`` is collected."""
+        bits = bytearray((total + 7) // 8)
+        alive = self.alive
+        for i in range(total):
+            if not alive[i]:
+                bits[i >> 3] |= 1 << (i & 7)
+        return bytes(bits)
+
+    def restore_collected(self, bits: bytes, total: int):
+        for i in range(total):
+            if bits[i >> 3] & (1 << (i & 7)):
+                self.remove(i)
@@ -61,16 +61,21 @@ class Player:
         self.pos.y = max(0, min(self.pos.y, world.height))
         self._update_rect()
 
-    def draw(self, surface, camera):
-        draw_rect = camera.apply(self.rect)
+    def draw(self, surface, camera, pos=None):
+        """Draw at ``pos`` (e.g. interpolated between steps) or at the current position."""
+        rect = self.rect
+        if pos is not None:
+            rect = rect.copy()
+            rect.center = (int(pos.x), int(pos.y))
+        draw_rect = camera.apply(rect)
         pygame.draw.rect(surface, config.PLAYER_COLOR, draw_rect)
 
     def collect(self, pickup):
         if pickup:
-            if pickup["type"] == "lamp":
+            if pickup.type == "lamp":
                 self.inventory["lamp"] = True
             else:
-                self.inventory[pickup["type"]] += 1
+                self.inventory[pickup.type] += 1
 
     def to_dict(self):
         return {
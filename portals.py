@@ -4,61 +4,175 @@ import math
 import random
 import pygame
 import config
+import render
+import spatial
+
+
+_COLORKEY = (1, 2, 3)  # absent from every portal look
+
+
+class PortalAtlas:
+    """Pulse animation of one portal look (tint, camera scale), pre-rendered once.
+
+    The rings only take a few integer radii over a cycle, so frames with the same
+    radii share one sprite; drawing a portal is then a single blit. Sprites are
+    kept separate rather than in one strip: RLE colorkey blits of a sub-area
+    would still walk the strip's full rows.
+    """
+
+    def __init__(self, color, scale: float, radius: int = config.PORTAL_RADIUS, frames: int = config.PORTAL_ATLAS_FRAMES):
+        self.frames = frames
+        line = max(1, round(3 * scale))
+        self.half = round((radius + 15) * scale) + line + 1
+        self.size = 2 * self.half
+        by_radii = {}
+        self.sprites = []  # sprite of each frame
+        for frame in range(frames):
+            theta = math.tau * frame / frames
+            radii = tuple(int(radius + i * 6 + 3 * math.sin(theta + i)) for i in range(3))
+            if radii not in by_radii:
+                by_radii[radii] = self._render(color, scale, radius, radii, line)
+            self.sprites.append(by_radii[radii])
+
+    def _render(self, color, scale: float, radius: int, radii, line: int) -> pygame.Surface:
+        # Fond transparent par colorkey : le blit le plus rapide pour des pixels opaques
+        sprite = pygame.Surface((self.size, self.size))
+        sprite.fill(_COLORKEY)
+        sprite.set_colorkey(_COLORKEY, pygame.RLEACCEL)
+        render.note_allocation()
+        center = (self.half, self.half)
+        # HALO blanc (visible de jour comme de nuit)
+        pygame.draw.circle(sprite, (255, 255, 255), center, round((radius + 8) * scale), line)
+        # 3 anneaux épais
+        for rr in radii:
+            pygame.draw.circle(sprite, color, center, round(rr * scale), line)
+        # Point central
+        pygame.draw.circle(sprite, (255, 255, 255), center, round(4 * scale))
+        # --- DEBUG : croix magenta au centre (immanquable)
+        if getattr(config, "DEBUG", False):
+            arm = round(12 * scale)
+            pygame.draw.line(sprite, (255, 0, 255), (self.half - arm, self.half), (self.half + arm, self.half), line)
+            pygame.draw.line(sprite, (255, 0, 255), (self.half, self.half - arm), (self.half, self.half + arm), line)
+        return sprite
+
+    def sprite(self, theta: float) -> pygame.Surface:
+        """Frame for pulse angle ``theta``."""
+        return self.sprites[int(theta % math.tau / math.tau * self.frames) % self.frames]
+
+
+_ATLASES = {}
+
+
+def atlas_for(color, scale: float) -> PortalAtlas:
+    key = (color, scale, getattr(config, "DEBUG", False))
+    atlas = _ATLASES.get(key)
+    if atlas is None:
+        atlas = _ATLASES[key] = PortalAtlas(color, scale)
+    return atlas
 
 
 class Portal:
     """Generic portal; behavior decided by kind (real or trap)."""
 
-    def __init__(self, position: pygame.Vector2, kind: str = "real"):
+    def __init__(self, position: pygame.Vector2, kind: str = "real", destination: str | None = None):
         self.pos = pygame.Vector2(position)
         self.kind = kind
+        # Monde d'arrivée d'un portail piège (nom de biome) ; le vrai portail mène à la victoire
+        self.destination = destination
         self.radius = config.PORTAL_RADIUS
         self.phase = random.random() * math.pi
         self.tint_shift = random.randint(-8, 8)
-    
-    def draw(self, surface: pygame.Surface, camera, time_ms: int):
         # Couleur de base avec légère variation
-        base_color = tuple(max(0, min(255, c + self.tint_shift)) for c in config.PORTAL_BASE_COLOR)
-        color = base_color
-    
-        # En mode DEBUG, forcer une couleur très visible
-        if getattr(config, "DEBUG", False):
-            color = getattr(config, "PORTAL_DEBUG_COLOR", (255, 0, 255))
-    
-        # Pulsation
-        pulse = 2 + int(2 * math.sin(time_ms * 0.005 + self.phase))
-    
-        # Rect monde -> écran
-        world_rect = pygame.Rect(
-            self.pos.x - self.radius - pulse,
-            self.pos.y - self.radius - pulse,
-            2 * (self.radius + pulse),
-            2 * (self.radius + pulse),
-        )
-        screen_rect = camera.apply(world_rect)
-        cx, cy = screen_rect.center
-    
-        # HALO blanc (visible de jour comme de nuit)
-        pygame.draw.circle(surface, (255, 255, 255), (cx, cy), self.radius + 8, 3)
-    
-        # 3 anneaux épais
-        for i in range(3):
-            rr = int(self.radius + i * 6 + 3 * math.sin(self.phase + i + time_ms * 0.005))
-            pygame.draw.circle(surface, color, (cx, cy), rr, 3)
-    
-        # Point central
-        pygame.draw.circle(surface, (255, 255, 255), (cx, cy), 4)
-    
-        # --- DEBUG : croix magenta au centre (immanquable)
-        if getattr(config, "DEBUG", False):
-            pygame.draw.line(surface, (255, 0, 255), (cx - 12, cy), (cx + 12, cy), 3)
-            pygame.draw.line(surface, (255, 0, 255), (cx, cy - 12), (cx, cy + 12), 3)
+        self.color = tuple(max(0, min(255, c + self.tint_shift)) for c in config.PORTAL_BASE_COLOR)
+        self._atlas_cache = None
+        self._atlas_scale = None
+
+    def _atlas(self, camera) -> PortalAtlas:
+        if self._atlas_scale != camera.scale:
+            # En mode DEBUG, forcer une couleur très visible
+            color = self.color
+            if getattr(config, "DEBUG", False):
+                color = getattr(config, "PORTAL_DEBUG_COLOR", (255, 0, 255))
+            self._atlas_cache = atlas_for(color, camera.scale)
+            self._atlas_scale = camera.scale
+        return self._atlas_cache
+
+    def screen_rect(self, camera) -> pygame.Rect:
+        """Screen area the portal covers at any point of its pulse."""
+        atlas = self._atlas(camera)
+        # Centre monde -> écran
+        cx, cy = camera.apply(pygame.Rect(self.pos.x, self.pos.y, 0, 0)).topleft
+        return pygame.Rect(cx - atlas.half, cy - atlas.half, atlas.size, atlas.size)
+
+    def draw(self, surface: pygame.Surface, camera, time_ms: int):
+        dest = self.screen_rect(camera)
+        # Rien à faire hors de la zone dessinée
+        if not dest.colliderect(surface.get_clip()):
+            return
+        # Pulsation : image de l'atlas choisie par le temps et la phase du portail
+        surface.blit(self._atlas(camera).sprite(self.phase + time_ms * 0.005), dest)
+
+    def linked(self, destination: str | None) -> "Portal":
+        """Same portal, same look, leading to ``destination``."""
+        twin = Portal(self.pos, self.kind, destination)
+        twin.phase = self.phase
+        twin.tint_shift = self.tint_shift
+        twin.color = self.color
+        return twin
 
     def collides_with(self, player_rect: pygame.Rect) -> bool:
         distance = pygame.Vector2(player_rect.center).distance_to(self.pos)
         return distance <= self.radius + max(player_rect.width, player_rect.height) / 2
 
 
+class PortalNetwork:
+    """The portals of one world, with a grid index for view, proximity and collision queries.
+
+    ``extras_placed`` records whether ``place_network`` already ran for this
+    world, so loading a save never places a second set. Portals are also kept
+    per kind, so looking up the few real portals never walks the traps.
+    """
+
+    def __init__(self, cell_size: int = config.PORTAL_GRID_CELL):
+        self.portals: list[Portal] = []
+        self.by_kind: dict[str, list[Portal]] = {}
+        self.index = spatial.SpatialHash(cell_size)
+        self.extras_placed = False
+
+    def __len__(self) -> int:
+        return len(self.portals)
+
+    def __iter__(self):
+        return iter(self.portals)
+
+    def add(self, portal: Portal) -> Portal:
+        self.index.insert_point(len(self.portals), portal.pos.x, portal.pos.y)
+        self.portals.append(portal)
+        self.by_kind.setdefault(portal.kind, []).append(portal)
+        return portal
+
+    def in_rect(self, rect: pygame.Rect) -> list[Portal]:
+        """Portals whose centre lies in ``rect`` (world space)."""
+        portals = self.portals
+        return [portals[i] for i in self.index.candidates(rect) if rect.collidepoint(portals[i].pos)]
+
+    def near(self, pos, radius: float) -> list[Portal]:
+        reach = int(radius) + 1
+        area = pygame.Rect(int(pos[0]) - reach, int(pos[1]) - reach, 2 * reach + 1, 2 * reach + 1)
+        return [portal for portal in self.in_rect(area) if portal.pos.distance_to(pos) <= radius]
+
+    def colliding(self, player_rect: pygame.Rect) -> Portal | None:
+        """The portal the player touches, the real one first if several do."""
+        reach = config.PORTAL_RADIUS + max(player_rect.width, player_rect.height)
+        touching = [portal for portal in self.in_rect(player_rect.inflate(2 * reach, 2 * reach)) if portal.collides_with(player_rect)]
+        touching.sort(key=lambda portal: portal.kind != "real")
+        return touching[0] if touching else None
+
+    def nearest(self, pos, kind: str) -> Portal | None:
+        """Closest portal of ``kind``, scanning that kind only."""
+        return min(self.by_kind.get(kind, ()), key=lambda portal: portal.pos.distance_squared_to(pos), default=None)
+
+
 def place_portals(spawn: pygame.Vector2):
     angle = random.uniform(0, math.tau)
     dist = random.randint(config.PORTAL_MIN_R, config.PORTAL_MAX_R)
@@ -74,3 +188,49 @@ def place_portals(spawn: pygame.Vector2):
         spawn.y + dist2 * math.sin(angle2),
     )
     return Portal(true_pos, "real"), Portal(trap_pos, "trap")
+
+
+def next_world(biome: str) -> str:
+    """World a classic trap portal leads to: the next biome, cycling."""
+    biomes = list(config.BIOMES)
+    return biomes[(biomes.index(biome) + 1) % len(biomes)]
+
+
+def classic_networks(real: Portal | None, trap: Portal | None) -> dict[str, PortalNetwork]:
+    """The original layout in every world: the same real and trap portal, the trap leading on."""
+    networks = {}
+    for biome in config.BIOMES:
+        network = networks[biome] = PortalNetwork()
+        if real:
+            network.add(real)
+        if trap:
+            network.add(trap.linked(next_world(biome)))
+    return networks
+
+
+def place_network(network: PortalNetwork, world, count: int, rng):
+    """Add ``count`` trap portals to other worlds, spread over ``world``.
+
+    Portals keep ``PORTAL_MIN_SEPARATION`` from each other and from the
+    spawn, and never overlap a rock; placement gives up after a bounded
+    number of attempts on crowded maps.
+    """
+    others = [biome for biome in config.BIOMES if biome != world.biome] or [world.biome]
+    spawn = pygame.Vector2(config.PLAYER_SPAWN)
+    separation = config.PORTAL_MIN_SEPARATION
+    margin = config.PORTAL_RADIUS + 16
+    added = 0
+    for _ in range(count * 30):
+        if added == count:
+            break
+        pos = pygame.Vector2(rng.uniform(margin, world.width - margin), rng.uniform(margin, world.height - margin))
+        if pos.distance_to(spawn) < separation or network.near(pos, separation):
+            continue
+        if world.query_rect(pygame.Rect(pos.x - margin, pos.y - margin, 2 * margin, 2 * margin)):
+            continue
+        portal = Portal(pos, "trap", rng.choice(others))
+        portal.phase = rng.random() * math.pi
+        network.add(portal)
+        added += 1
+    network.extras_placed = True
+    return added
@@ -0,0 +1,142 @@
+"""Stateless, coordinate-hashed world generation.
+
+Every function here depends only on ``(seed, biome, cell)`` and the config:
+any region of a world can be generated on its own, in any order, on any
+thread, or skipped entirely. Cells are ``GEN_CELL`` pixels square, aligned to
+the background tiles; a world is the grid of cells covering it.
+"""
+
+import hashlib
+import math
+import random
+
+import pygame
+import config
+
+# Speckles per default-size world; kept as a density so other world sizes look the same.
+SPECKLE_DENSITY = 800 / (8000 * 6000)
+
+
+def cell_rng(seed: int, biome: str, kind: str, cx: int = 0, cy: int = 0) -> random.Random:
+    """Private RNG for one kind of content in one cell; never touches the global RNG."""
+    digest = hashlib.blake2b(f"{seed}/{biome}/{kind}/{cx}/{cy}".encode("utf-8"), digest_size=8).digest()
+    return random.Random(int.from_bytes(digest, "little"))
+
+
+def _count(rng: random.Random, expected: float) -> int:
+    """``expected`` rounded up or down at random, so per-cell counts add up to the density."""
+    whole = int(expected)
+    return whole + (rng.random() < expected - whole)
+
+
+class WorldGen:
+    """Generator for one ``(seed, biome)`` world.
+
+    Pickups are the only content with a world-wide total (``PICKUP_COUNT_RANGE``):
+    the total is hashed from the seed, split evenly over the cells and the cells
+    shuffled by a hashed permutation, so each cell still knows its own share and
+    pickup ids without looking at any other cell.
+    """
+
+    def __init__(self, seed: int, biome: str, width: int | None = None, height: int | None = None):
+        self.seed = seed
+        self.biome = biome
+        self.width = width or config.WORLD_WIDTH
+        self.height = height or config.WORLD_HEIGHT
+        self.cell = config.GEN_CELL
+        self.cols = math.ceil(self.width / self.cell)
+        self.rows = math.ceil(self.height / self.cell)
+        self.cell_count = self.cols * self.rows
+        self.colors = len(config.BIOMES[biome]["base_colors"])
+        self.rock_density = config.DESERT_ROCK_DENSITY if biome == "desert" else config.FOREST_ROCK_DENSITY
+
+        self.pickup_total = cell_rng(seed, biome, "pickup-count").randint(*config.PICKUP_COUNT_RANGE)
+        spread = cell_rng(seed, biome, "pickup-spread")
+        self._stride = spread.randrange(1, self.cell_count + 1)
+        while math.gcd(self._stride, self.cell_count) != 1:
+            self._stride += 1
+        self._shift = spread.randrange(self.cell_count)
+
+    def cells(self):
+        """Every cell of the world, row by row."""
+        for cy in range(self.rows):
+            for cx in range(self.cols):
+                yield cx, cy
+
+    def cells_in_rect(self, rect: pygame.Rect):
+        size = self.cell
+        cx0, cy0 = max(0, rect.left // size), max(0, rect.top // size)
+        cx1 = min(self.cols - 1, (rect.right - 1) // size)
+        cy1 = min(self.rows - 1, (rect.bottom - 1) // size)
+        for cy in range(cy0, cy1 + 1):
+            for cx in range(cx0, cx1 + 1):
+                yield cx, cy
+
+    def cell_rect(self, cx: int, cy: int) -> pygame.Rect:
+        x0, y0 = cx * self.cell, cy * self.cell
+        return pygame.Rect(x0, y0, min(self.cell, self.width - x0), min(self.cell, self.height - y0))
+
+    def rocks(self, cx: int, cy: int) -> list[pygame.Rect]:
+        """Rocks whose top-left corner lies in the cell; they may overhang into the next cells."""
+        area = self.cell_rect(cx, cy)
+        rng = cell_rng(self.seed, self.biome, "rocks", cx, cy)
+        rand = rng.random
+        low, high = config.ROCK_SIZE_RANGE
+        span = high - low + 1
+        rocks = []
+        for _ in range(_count(rng, area.width * area.height * self.rock_density)):
+            w = low + int(rand() * span)
+            h = low + int(rand() * span)
+            x = min(area.left + int(rand() * area.width), self.width - w)
+            y = min(area.top + int(rand() * area.height), self.height - h)
+            rocks.append(pygame.Rect(x, y, w, h))
+        return rocks
+
+    def pickup_ids(self, cx: int, cy: int) -> range:
+        share = (((cy * self.cols + cx) * self._stride) + self._shift) % self.cell_count
+        total, cells = self.pickup_total, self.cell_count
+        return range(total * share // cells, total * (share + 1) // cells)
+
+    def pickups(self, cx: int, cy: int) -> list[tuple[int, str, float, float]]:
+        """``(id, type, x, y)`` of the pickups generated in the cell."""
+        ids = self.pickup_ids(cx, cy)
+        if not ids:
+            return []
+        area = self.cell_rect(cx, cy)
+        rng = cell_rng(self.seed, self.biome, "pickups", cx, cy)
+        spawn = pygame.Vector2(config.PLAYER_SPAWN)
+        available = list(config.BIOMES[self.biome]["pickup_types"])
+        found = []
+        for pickup_id in ids:
+            # The forest always holds the lamp: it is pickup 0 there.
+            ptype = "lamp" if self.biome == "forest" and pickup_id == 0 else rng.choice(available)
+            for _ in range(6):
+                x = area.left + rng.randrange(area.width)
+                y = area.top + rng.randrange(area.height)
+                if spawn.distance_to((x, y)) > config.PICKUP_MIN_DIST_FROM_SPAWN:
+                    break
+            found.append((pickup_id, ptype, float(x), float(y)))
+        return found
+
+    def tiles(self, cx: int, cy: int) -> tuple[pygame.Rect, bytes]:
+        """Palette index of each background tile in the cell, row-major, with the tile rect covered."""
+        area = self.cell_rect(cx, cy)
+        tile = config.BG_TILE
+        tiles = pygame.Rect(area.left // tile, area.top // tile, math.ceil(area.width / tile), math.ceil(area.height / tile))
+        rand = cell_rng(self.seed, self.biome, "tiles", cx, cy).random
+        colors = self.colors
+        return tiles, bytes(int(rand() * colors) for _ in range(tiles.width * tiles.height))
+
+    def speckles(self, cx: int, cy: int) -> list[tuple[int, int, int]]:
+        """Grain/grass speckles ``(x, y, radius)`` centred in the cell."""
+        area = self.cell_rect(cx, cy)
+        rng = cell_rng(self.seed, self.biome, "speckles", cx, cy)
+        return [
+            (area.left + rng.randrange(area.width), area.top + rng.randrange(area.height), rng.randint(1, 2))
+            for _ in range(_count(rng, area.width * area.height * SPECKLE_DENSITY))
+        ]
+
+    def bands(self) -> list[tuple[float, int, int]]:
+        """Dune bands ``(base y, amplitude, wavelength)``; they span the whole world."""
+        rng = cell_rng(self.seed, self.biome, "bands")
+        return [(self.height * (band + 1) / 11, rng.randint(4, 8), rng.randint(140, 220)) for band in range(10)]
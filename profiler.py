@@ -0,0 +1,161 @@
+"""Per-stage frame profiler with rolling percentiles, an on-screen overlay and trace dumps."""
+
+import csv
+import json
+import time
+from collections import deque
+
+import pygame
+import config
+import fonts
+import render
+
+
+def percentile(sorted_values, fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class FrameProfiler:
+    """Attributes wall time between ``mark`` calls to named stages.
+
+    Every method returns immediately while neither the overlay nor a trace is
+    active, so leaving the calls in the frame loop costs close to nothing.
+    """
+
+    def __init__(self, window: int = config.PROFILER_WINDOW):
+        self.overlay = False
+        self.tracing = False
+        self.trace_path = None
+        self.trace_rows = []
+        self.frames = deque(maxlen=window)  # (dt_ms, work_ms, {stage: ms})
+        self.frame_index = 0
+        self.extra_lines = []
+        self._active = False  # toggles take effect from the next frame
+        self._start = 0.0
+        self._last = 0.0
+        self._dt = 0.0
+        self._stages = {}
+        self._panel = None
+        self._panel_time = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self.overlay or self.tracing
+
+    def toggle_overlay(self):
+        self.overlay = not self.overlay
+        self._panel = None
+
+    def begin_frame(self, dt_ms: float):
+        self._active = self.overlay or self.tracing
+        if not self._active:
+            return
+        self._start = self._last = time.perf_counter()
+        self._dt = dt_ms
+        self._stages = {}
+
+    def mark(self, stage: str):
+        if not self._active:
+            return
+        now = time.perf_counter()
+        self._stages[stage] = self._stages.get(stage, 0.0) + (now - self._last) * 1000
+        self._last = now
+
+    def end_frame(self, allocations: int = 0):
+        if not self._active:
+            return
+        self.mark("other")
+        work = (self._last - self._start) * 1000
+        self.frames.append((self._dt, work, self._stages))
+        self.frame_index += 1
+        if self.tracing:
+            row = {"frame": self.frame_index, "dt_ms": round(self._dt, 3), "work_ms": round(work, 3), "allocations": allocations}
+            row.update({stage: round(ms, 3) for stage, ms in self._stages.items()})
+            self.trace_rows.append(row)
+
+    def stats(self) -> dict:
+        """Rolling p50/p95/p99 of frame work time and dt, and mean ms per stage."""
+        if not self.frames:
+            return {}
+        work = sorted(frame[1] for frame in self.frames)
+        dts = sorted(frame[0] for frame in self.frames)
+        stages = {}
+        for _, _, frame_stages in self.frames:
+            for stage, ms in frame_stages.items():
+                stages[stage] = stages.get(stage, 0.0) + ms
+        count = len(self.frames)
+        return {
+            "frames": count,
+            "work": {p: percentile(work, f) for p, f in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99))},
+            "dt": {p: percentile(dts, f) for p, f in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99))},
+            "stages": {stage: total / count for stage, total in stages.items()},
+        }
+
+    # --- trace -----------------------------------------------------------------------
+
+    def start_trace(self, path: str | None = None):
+        self.tracing = True
+        self.trace_path = path or config.PROFILER_TRACE_FILE
+        self.trace_rows = []
+
+    def stop_trace(self):
+        """Write collected rows as CSV, or JSON when the path ends in .json."""
+        if not self.tracing:
+            return
+        self.tracing = False
+        rows, self.trace_rows = self.trace_rows, []
+        if self.trace_path.endswith(".json"):
+            with open(self.trace_path, "w", encoding="utf-8") as f:
+                json.dump(rows, f)
+            return
+        columns = ["frame", "dt_ms", "work_ms", "allocations"]
+        for row in rows:
+            columns += [key for key in row if key not in columns]
+        with open(self.trace_path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=columns, restval=0)
+            writer.writeheader()
+            writer.writerows(rows)
+
+    def toggle_trace(self):
+        if self.tracing:
+            self.stop_trace()
+        else:
+            self.start_trace()
+
+    # --- overlay ---------------------------------------------------------------------
+
+    def draw(self, surface: pygame.Surface):
+        """Blit the overlay panel; its text is rebuilt a few times per second only."""
+        if not self.overlay:
+            return
+        now = time.perf_counter()
+        if self._panel is None or now - self._panel_time > config.PROFILER_REFRESH:
+            self._panel = self._build_panel()
+            self._panel_time = now
+        surface.blit(self._panel, (surface.get_width() - self._panel.get_width() - 10, 80))
+
+    def _build_panel(self) -> pygame.Surface:
+        font = fonts.get(14)
+        stats = self.stats()
+        lines = []
+        if stats:
+            work, dt = stats["work"], stats["dt"]
+            fps = 1000 / dt["p50"] if dt["p50"] else 0
+            lines.append(f"FPS {fps:.0f}   dt p50 {dt['p50']:.1f}  p95 {dt['p95']:.1f}  p99 {dt['p99']:.1f} ms")
+            lines.append(f"frame p50 {work['p50']:.2f}  p95 {work['p95']:.2f}  p99 {work['p99']:.2f} ms")
+            for stage, ms in sorted(stats["stages"].items(), key=lambda item: -item[1]):
+                lines.append(f"  {stage:<10} {ms:6.2f} ms")
+        lines += self.extra_lines
+        if self.tracing:
+            lines.append(f"trace -> {self.trace_path} ({len(self.trace_rows)} frames)")
+        rendered = [font.render(line, True, config.HUD_TEXT_COLOR) for line in lines]
+        render.note_allocation(len(rendered) + 1)
+        width = max((text.get_width() for text in rendered), default=0) + 16
+        panel = pygame.Surface((width, len(rendered) * 16 + 12), pygame.SRCALPHA)
+        panel.fill((*config.HUD_COLOR, config.HUD_BG_ALPHA))
+        for i, text in enumerate(rendered):
+            panel.blit(text, (8, 6 + i * 16))
+        return panel
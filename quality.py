@@ -0,0 +1,79 @@
+"""Adaptive quality governor: trades heat haze and internal resolution for frame time."""
+
+from collections import deque
+
+import config
+
+# Highest quality first. ``scale`` is the internal render resolution relative to the display;
+# scale * BG_CHUNK_SIZE must stay whole so scaled background chunks tile without seams.
+# Fractional scales like 0.75 are left out: with software surfaces the non-integer upscale
+# costs more than the smaller canvas saves.
+LEVELS = (
+    {"name": "Haute", "scale": 1.0, "haze": True},
+    {"name": "Moyenne", "scale": 1.0, "haze": False},
+    {"name": "Basse", "scale": 0.5, "haze": False},
+)
+
+# Cycle order of the "Qualité" setting.
+MODES = ("auto",) + tuple(range(len(LEVELS)))
+
+
+def mode_label(mode) -> str:
+    return "Auto" if mode == "auto" else LEVELS[mode]["name"]
+
+
+class QualityGovernor:
+    """Watches recent draw times against ``QUALITY_BUDGET_MS`` and picks a level.
+
+    Every ``QUALITY_WINDOW`` frames the 90th percentile draw time is compared
+    with the budget. Over budget: one level down, unless that level was last
+    measured no cheaper. Well under budget: one level up, with a retry delay
+    that doubles each time the higher level immediately proves too slow again,
+    so quality does not flap between two levels.
+    """
+
+    def __init__(self):
+        self.level = 0
+        self.samples = deque(maxlen=config.QUALITY_WINDOW)
+        self.costs = {}  # level -> last measured p90 draw time
+        self.patience = 1  # good windows required before stepping up
+        self.good_windows = 0
+        self.just_raised = False
+
+    @property
+    def current(self) -> dict:
+        return LEVELS[self.level]
+
+    def update(self, draw_ms: float, mode):
+        """Record one frame's draw time; ``mode`` is "auto" or a fixed level index."""
+        if mode != "auto":
+            self.level = mode
+            self.samples.clear()
+            return
+        self.samples.append(draw_ms)
+        if len(self.samples) < self.samples.maxlen:
+            return
+        p90 = sorted(self.samples)[int(len(self.samples) * 0.9)]
+        self.samples.clear()
+        self.costs[self.level] = p90
+        budget = config.QUALITY_BUDGET_MS
+        raised, self.just_raised = self.just_raised, False
+
+        if p90 > budget:
+            self.good_windows = 0
+            lower = self.level + 1
+            if lower < len(LEVELS) and self.costs.get(lower, 0.0) < p90:
+                if raised:
+                    self.patience = min(self.patience * 2, 32)
+                self.level = lower
+            elif self.level > 0 and self.costs.get(self.level - 1, p90) < p90:
+                # This level turned out dearer than the one above it (e.g. upscaling a daytime frame).
+                self.level -= 1
+        elif p90 < budget * config.QUALITY_HEADROOM and self.level > 0:
+            self.good_windows += 1
+            if self.good_windows >= self.patience:
+                self.level -= 1
+                self.good_windows = 0
+                self.just_raised = True
+        else:
+            self.good_windows = 0
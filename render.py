@@ -0,0 +1,131 @@
+"""Reusable render targets, dirty-rect presentation, a shared text cache and a per-frame surface allocation counter."""
+
+from collections import OrderedDict
+
+import pygame
+import config
+
+_allocated = 0
+
+
+def note_allocation(count: int = 1):
+    global _allocated
+    _allocated += count
+
+
+def new_surface(size, alpha: bool = False) -> pygame.Surface:
+    """Allocate a surface in the display pixel format and count it in the frame stats."""
+    note_allocation()
+    if alpha:
+        return pygame.Surface(size, pygame.SRCALPHA)
+    display = pygame.display.get_surface()
+    if display is not None:
+        return pygame.Surface(size, 0, display)
+    return pygame.Surface(size)
+
+
+def take_allocations() -> int:
+    """Return the number of surfaces allocated since the last call and reset it."""
+    global _allocated
+    count, _allocated = _allocated, 0
+    return count
+
+
+class RenderTargets:
+    """Named buffers owned by the game, recreated only when their size changes or on clear()."""
+
+    def __init__(self):
+        self.targets: dict[str, pygame.Surface] = {}
+        self.serials: dict[str, int] = {}  # name -> creation number of the current buffer
+        self.created = 0
+        self.frame_allocations = 0
+
+    def get(self, name: str, size, alpha: bool = False, fill=None) -> pygame.Surface:
+        """Return the buffer ``name``; ``fill`` is applied only when it is (re)created."""
+        surf = self.targets.get(name)
+        if surf is None or surf.get_size() != tuple(size):
+            surf = new_surface(size, alpha)
+            if fill is not None:
+                surf.fill(fill)
+            self.targets[name] = surf
+            self.created += 1
+            self.serials[name] = self.created
+        return surf
+
+    def serial(self, name: str) -> int:
+        """Changes whenever ``name`` is recreated, so callers know its contents are gone."""
+        return self.serials.get(name, 0)
+
+    def clear(self):
+        """Forget every buffer, e.g. after a resize or fullscreen toggle changed the display."""
+        self.targets.clear()
+
+    def end_frame(self):
+        self.frame_allocations = take_allocations()
+
+
+class DirtyRects:
+    """What changed on the display this frame, so ``present`` pushes only that.
+
+    Frames are presented in full unless the code that drew them declared
+    otherwise with ``partial``; drawing paths that know nothing about dirty
+    regions therefore stay correct.
+    """
+
+    def __init__(self):
+        self.full = True
+        self.rects: list[pygame.Rect] = []
+        self.pushed_pixels = 0  # for the profiler overlay
+
+    def invalidate(self):
+        """Something was drawn over the whole display: present all of it."""
+        self.full = True
+
+    def partial(self, rects=()):
+        """Only ``rects`` changed (none at all if empty)."""
+        self.full = False
+        self.rects.extend(rects)
+
+    def present(self):
+        if self.full:
+            pygame.display.flip()
+            width, height = pygame.display.get_surface().get_size()
+            self.pushed_pixels = width * height
+        else:
+            if self.rects:
+                pygame.display.update(self.rects)
+            self.pushed_pixels = sum(rect.width * rect.height for rect in self.rects)
+        self.full = True
+        self.rects = []
+
+
+class TextCache:
+    """Bounded LRU of rendered text surfaces keyed by (font, text, color, antialias)."""
+
+    def __init__(self, max_entries: int = config.TEXT_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.entries: OrderedDict[tuple, pygame.Surface] = OrderedDict()
+
+    def render(self, font: pygame.font.Font, text: str, color, antialias: bool = True) -> pygame.Surface:
+        key = (font, text, tuple(color), antialias)
+        surf = self.entries.get(key)
+        if surf is not None:
+            self.entries.move_to_end(key)
+            return surf
+        surf = font.render(text, antialias, color)
+        note_allocation()
+        self.entries[key] = surf
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        return surf
+
+    def clear(self):
+        self.entries.clear()
+
+
+text_cache = TextCache()
+
+
+def text(font: pygame.font.Font, string: str, color, antialias: bool = True) -> pygame.Surface:
+    """Render ``string`` through the shared cache; the returned surface must not be modified."""
+    return text_cache.render(font, string, color, antialias)
@@ -1,44 +1,283 @@
-"""Save/load helpers for JSON persistence."""
+"""Save/load helpers: save slots, compact versioned binary saves; legacy JSON saves are still read.
 
+Pickups are fully determined by the seed, so a save stores the seed and, per
+world, a bitset of collected pickup ids instead of every remaining position.
+Layout (little-endian), zlib-compressed after the header::
+
+    header   magic "JMSV", format version
+    state    seed, world generation, current world, time of day,
+             player x/y, speed index, water, torch, lamp
+    networks count, then per world: biome index, extras placed, portal count,
+             then per portal: kind, destination biome (255: none), x, y
+    settings length-prefixed compact JSON (the settings dict is open-ended)
+    worlds   count, then per world: biome index, pickup total, bitset,
+             extra count, then per extra pickup: type index, x, y
+
+Extra pickups are those not generated from the seed, e.g. the pickups of a
+legacy save made under an older generation. Version 1 saves stored a single
+real and trap portal instead of networks; they still load, as the classic
+two-portal layout. Version 2 saves have no extras.
+
+Loaded worlds are lazy: rocks and pickups are restored at once, background
+layout and pixels only when a world is first drawn.
+
+Slots live in ``config.SAVE_DIR`` next to a small JSON index holding each
+slot's metadata and thumbnail, so listing saves never opens a save file.
+"""
+
+import base64
 import json
 import os
+import struct
+import time
+import zlib
 import pygame
 import config
+import pickups as pickups_module
+import portals as portals_module
 import world as world_module
 
+MAGIC = b"JMSV"
+VERSION = 3
+
+_HEADER = struct.Struct("<4sB")
+_STATE = struct.Struct("<IHBdddBHHB")
+_PORTAL = struct.Struct("<Bdd")  # version 1
+_NETWORK = struct.Struct("<BBH")
+_NETWORK_PORTAL = struct.Struct("<BBdd")
+_KINDS = ("real", "trap")
+_NO_DESTINATION = 255
+_LENGTH = struct.Struct("<H")
+_WORLD = struct.Struct("<BI")
+_EXTRA = struct.Struct("<Bdd")
+_LENGTH_EXTRAS = struct.Struct("<I")
+
+
+def _write_atomic(path: str, data: bytes):
+    # Write, sync, then rename so a crash mid-save never leaves a truncated file behind.
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def save_game(player, worlds: dict, current_world: str, networks: dict, settings, time_of_day: float, path: str | None = None):
+    biomes = list(config.BIOMES)
+    seed = worlds[current_world].seed
+    parts = [
+        _STATE.pack(
+            seed,
+            world_module.GENERATION,
+            biomes.index(current_world),
+            time_of_day,
+            player.pos.x,
+            player.pos.y,
+            player.speed_index,
+            player.inventory.get("water", 0),
+            player.inventory.get("torch", 0),
+            bool(player.inventory.get("lamp", False)),
+        )
+    ]
+    parts.append(bytes([len(networks)]))
+    for name, network in networks.items():
+        parts.append(_NETWORK.pack(biomes.index(name), network.extras_placed, len(network)))
+        for portal in network:
+            destination = biomes.index(portal.destination) if portal.destination else _NO_DESTINATION
+            parts.append(_NETWORK_PORTAL.pack(_KINDS.index(portal.kind), destination, portal.pos.x, portal.pos.y))
+    blob = json.dumps(settings, separators=(",", ":")).encode("utf-8")
+    parts += [_LENGTH.pack(len(blob)), blob, bytes([len(worlds)])]
+    for name, w in worlds.items():
+        extras = w.extra_pickups()
+        parts += [_WORLD.pack(biomes.index(name), w.pickup_total), w.collected_bits(), _LENGTH_EXTRAS.pack(len(extras))]
+        parts += [_EXTRA.pack(pickups_module.TYPES.index(ptype), x, y) for ptype, x, y in extras]
+
+    data = _HEADER.pack(MAGIC, VERSION) + zlib.compress(b"".join(parts), 9)
+    _write_atomic(path or config.SAVE_FILE, data)
 
-def save_game(player, worlds: dict, current_world: str, portals, settings, time_of_day: float):
-    data = {
-        "player": player.to_dict(),
-        "worlds": {name: w.to_dict() for name, w in worlds.items()},
-        "current_world": current_world,
-        "portals": {
-            "real": [portals[0].pos.x, portals[0].pos.y] if portals[0] else None,
-            "trap": [portals[1].pos.x, portals[1].pos.y] if portals[1] else None,
-        },
-        "settings": settings,
-        "time_of_day": time_of_day,
-    }
-    with open(config.SAVE_FILE, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2)
 
+def legacy_save_path() -> str | None:
+    """The single pre-slot save file, if one exists."""
+    for path in (config.SAVE_FILE, config.LEGACY_SAVE_FILE):
+        if os.path.exists(path):
+            return path
+    return None
 
-def load_game(player_cls, portal_cls):
-    if not os.path.exists(config.SAVE_FILE):
+
+def load_game(player_cls, portal_cls, path: str | None = None):
+    path = path or legacy_save_path()
+    if path is None or not os.path.exists(path):
+        return None
+    with open(path, "rb") as f:
+        data = f.read()
+    if data.startswith(MAGIC):
+        return _load_binary(data, player_cls, portal_cls)
+    try:
+        data = json.loads(data.decode("utf-8"))
+    except ValueError:
+        return None
+    return _load_json(data, player_cls, portal_cls)
+
+
+def _load_binary(data: bytes, player_cls, portal_cls):
+    """The loaded game, or None for a save from a newer version or a damaged file."""
+    try:
+        return _read_binary(data, player_cls, portal_cls)
+    except (zlib.error, struct.error, IndexError, ValueError):
+        return None
+
+
+def _read_binary(data: bytes, player_cls, portal_cls):
+    _, version = _HEADER.unpack_from(data)
+    if version > VERSION:
+        return None
+    payload = zlib.decompress(data[_HEADER.size :])
+    biomes = list(config.BIOMES)
+
+    seed, generation, current, time_of_day, x, y, speed_index, water, torch, lamp = _STATE.unpack_from(payload)
+    offset = _STATE.size
+    player = player_cls.from_dict(
+        {"pos": [x, y], "speed_index": speed_index, "inventory": {"water": water, "torch": torch, "lamp": bool(lamp)}}
+    )
+    if version == 1:
+        found = []
+        for kind in _KINDS:
+            present, px, py = _PORTAL.unpack_from(payload, offset)
+            offset += _PORTAL.size
+            found.append(portal_cls(pygame.Vector2(px, py), kind) if present else None)
+        networks = portals_module.classic_networks(*found)
+    else:
+        networks, offset = _read_networks(payload, offset, portal_cls)
+    (length,) = _LENGTH.unpack_from(payload, offset)
+    offset += _LENGTH.size
+    settings = json.loads(payload[offset : offset + length].decode("utf-8"))
+    offset += length
+
+    worlds = {}
+    count = payload[offset]
+    offset += 1
+    for _ in range(count):
+        biome_index, total = _WORLD.unpack_from(payload, offset)
+        offset += _WORLD.size
+        size = (total + 7) // 8
+        bits = payload[offset : offset + size]
+        offset += size
+        extras = []
+        if version >= 3:
+            (extra_count,) = _LENGTH_EXTRAS.unpack_from(payload, offset)
+            offset += _LENGTH_EXTRAS.size
+            for _ in range(extra_count):
+                ptype, px, py = _EXTRA.unpack_from(payload, offset)
+                offset += _EXTRA.size
+                extras.append((pickups_module.TYPES[ptype], px, py))
+        w = world_module.World(biomes[biome_index], seed, lazy=True)
+        w.restore_pickups(generation, total, bits, extras)
+        worlds[w.biome] = w
+    if not worlds:
         return None
-    with open(config.SAVE_FILE, "r", encoding="utf-8") as f:
-        data = json.load(f)
+    return player, worlds, networks, settings, biomes[current], time_of_day
+
+
+def _read_networks(payload: bytes, offset: int, portal_cls):
+    biomes = list(config.BIOMES)
+    networks = {}
+    count = payload[offset]
+    offset += 1
+    for _ in range(count):
+        biome_index, extras_placed, portal_count = _NETWORK.unpack_from(payload, offset)
+        offset += _NETWORK.size
+        network = networks[biomes[biome_index]] = portals_module.PortalNetwork()
+        network.extras_placed = bool(extras_placed)
+        for _ in range(portal_count):
+            kind, destination, x, y = _NETWORK_PORTAL.unpack_from(payload, offset)
+            offset += _NETWORK_PORTAL.size
+            destination = None if destination == _NO_DESTINATION else biomes[destination]
+            network.add(portal_cls(pygame.Vector2(x, y), _KINDS[kind], destination))
+    # A biome added since the save starts with an empty network; its extra portals come when it is generated.
+    for biome in biomes:
+        networks.setdefault(biome, portals_module.PortalNetwork())
+    return networks, offset
+
+
+def _load_json(data: dict, player_cls, portal_cls):
     player = player_cls.from_dict(data.get("player", {}))
     worlds_data = data.get("worlds", {})
     worlds = {}
     for name, wdata in worlds_data.items():
-        worlds[name] = world_module.World.from_dict(wdata)
+        worlds[name] = world_module.World.from_dict(wdata, lazy=True)
     if not worlds:
         return None
     portals_data = data.get("portals", {})
     real_portal = portal_cls(pygame.Vector2(portals_data["real"]), "real") if portals_data.get("real") else None
     trap_portal = portal_cls(pygame.Vector2(portals_data["trap"]), "trap") if portals_data.get("trap") else None
+    networks = portals_module.classic_networks(real_portal, trap_portal)
     settings = data.get("settings", {})
     current_world = data.get("current_world", "desert")
     time_of_day = data.get("time_of_day", 0.0)
-    return player, worlds, (real_portal, trap_portal), settings, current_world, time_of_day
+    return player, worlds, networks, settings, current_world, time_of_day
+
+
+# --- slots -------------------------------------------------------------------------------
+
+
+def slot_path(slot: int) -> str:
+    return os.path.join(config.SAVE_DIR, f"slot{slot}.dat")
+
+
+def _index_path() -> str:
+    return os.path.join(config.SAVE_DIR, "index.json")
+
+
+def read_index() -> dict[int, dict]:
+    """Slot number -> metadata; thumbnails stay encoded (see ``thumbnail_surface``).
+
+    A slot file the index does not describe (the index is missing or damaged,
+    or the game stopped between writing the slot and its index entry) is still
+    listed, with its file time as the only metadata.
+    """
+    try:
+        with open(_index_path(), "r", encoding="utf-8") as f:
+            data = json.load(f)
+        index = {int(slot): meta for slot, meta in data.get("slots", {}).items() if isinstance(meta, dict)}
+    except (OSError, ValueError, AttributeError):
+        index = {}
+    for slot in range(1, config.SAVE_SLOTS + 1):
+        path = slot_path(slot)
+        if slot not in index and os.path.exists(path):
+            index[slot] = {"timestamp": os.path.getmtime(path)}
+    return index
+
+
+def encode_thumbnail(surface: pygame.Surface) -> dict:
+    small = pygame.transform.smoothscale(surface, config.SAVE_THUMB_SIZE)
+    pixels = zlib.compress(pygame.image.tobytes(small, "RGB"), 9)
+    return {"size": list(config.SAVE_THUMB_SIZE), "rgb": base64.b64encode(pixels).decode("ascii")}
+
+
+def thumbnail_surface(meta: dict) -> pygame.Surface | None:
+    thumb = meta.get("thumbnail")
+    if not thumb:
+        return None
+    pixels = zlib.decompress(base64.b64decode(thumb["rgb"]))
+    return pygame.image.frombytes(pixels, tuple(thumb["size"]), "RGB")
+
+
+def save_slot(slot: int, screen: pygame.Surface | None, player, worlds: dict, current_world: str, networks: dict, settings, time_of_day: float):
+    """Write slot ``slot`` and then its index entry, each atomically."""
+    os.makedirs(config.SAVE_DIR, exist_ok=True)
+    save_game(player, worlds, current_world, networks, settings, time_of_day, path=slot_path(slot))
+    index = read_index()
+    index[slot] = {
+        "timestamp": time.time(),
+        "world": current_world,
+        "play_time": time_of_day,
+        "inventory": dict(player.inventory),
+        "thumbnail": encode_thumbnail(screen) if screen is not None else None,
+    }
+    data = {"version": 1, "slots": {str(n): meta for n, meta in sorted(index.items())}}
+    _write_atomic(_index_path(), json.dumps(data, separators=(",", ":")).encode("utf-8"))
+
+
+def load_slot(slot: int, player_cls, portal_cls):
+    return load_game(player_cls, portal_cls, path=slot_path(slot))
@@ -0,0 +1,133 @@
+"""Headless, uncapped gameplay simulation for bots, balance testing and batch runs.
+
+Usage::
+
+    python simulation.py --runs 1000 --steps 6000 --workers 8
+"""
+
+import argparse
+import json
+import random
+import time
+from multiprocessing import Pool
+
+import pygame
+
+import config
+import controls
+
+_game = None
+
+
+def _headless_game():
+    """One headless Game per process, reused across runs."""
+    global _game
+    if _game is None:
+        import main
+
+        _game = main.Game(headless=True)
+    return _game
+
+
+def simulate(seed: int, input_source, dt_ms: float = config.SIM_DT_MS, max_steps: int = config.SIM_MAX_STEPS) -> dict:
+    """Play one game from a fresh start at a fixed ``dt_ms`` until victory or ``max_steps``."""
+    game = _headless_game()
+    game._start_new_game(seed)
+    game.input = input_source
+    game.ensure_world(game.current_world)
+    game.fresh_game = False
+    game.state = "running"
+
+    switches = 0
+    steps = 0
+    while steps < max_steps and game.state != "victory":
+        keys = input_source.keys(game, dt_ms)
+        game.step(dt_ms, keys)
+        steps += 1
+        if game.state == "loading":
+            game.ensure_world(game.current_world)
+            game._enter_world()
+            game.state = "running"
+            switches += 1
+
+    return {
+        "seed": seed,
+        "outcome": "victory" if game.victory else "timeout",
+        "steps": steps,
+        "sim_time_s": game.sim_time_ms / 1000.0,
+        "world": game.current_world,
+        "world_switches": switches,
+        "inventory": dict(game.player.inventory),
+        "pickups_left": {name: len(w.pickups) for name, w in game.worlds.items()},
+        "player_pos": [game.player.pos.x, game.player.pos.y],
+    }
+
+
+DIRECTIONS = [
+    (pygame.K_LEFT,),
+    (pygame.K_RIGHT,),
+    (pygame.K_UP,),
+    (pygame.K_DOWN,),
+    (pygame.K_LEFT, pygame.K_UP),
+    (pygame.K_RIGHT, pygame.K_UP),
+    (pygame.K_LEFT, pygame.K_DOWN),
+    (pygame.K_RIGHT, pygame.K_DOWN),
+]
+
+
+def random_walk(seed: int, segments: int = 200) -> controls.ScriptedInput:
+    """Scripted bot holding random directions for 0.2-2 s each."""
+    rng = random.Random(seed)
+    return controls.ScriptedInput((rng.randint(200, 2000), rng.choice(DIRECTIONS)) for _ in range(segments))
+
+
+def _run_one(args):
+    seed, dt_ms, max_steps = args
+    return simulate(seed, random_walk(seed), dt_ms, max_steps)
+
+
+def run_batch(seeds, dt_ms: float = config.SIM_DT_MS, max_steps: int = config.SIM_MAX_STEPS, workers: int | None = None):
+    """Run the random-walk bot for every seed, spread over ``workers`` processes."""
+    jobs = [(seed, dt_ms, max_steps) for seed in seeds]
+    if workers == 1:
+        return [_run_one(job) for job in jobs]
+    # Close and join rather than terminate: SDL's signal handlers swallow SIGTERM in the workers.
+    pool = Pool(workers)
+    try:
+        return pool.map(_run_one, jobs, chunksize=8)
+    finally:
+        pool.close()
+        pool.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=100)
+    parser.add_argument("--first-seed", type=int, default=1)
+    parser.add_argument("--steps", type=int, default=config.SIM_MAX_STEPS)
+    parser.add_argument("--dt", type=float, default=config.SIM_DT_MS, help="fixed step in ms")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: all CPUs)")
+    parser.add_argument("--out", help="write every run as JSON to this file")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    seeds = range(args.first_seed, args.first_seed + args.runs)
+    results = run_batch(seeds, args.dt, args.steps, args.workers)
+    elapsed = time.perf_counter() - start
+
+    victories = sum(1 for r in results if r["outcome"] == "victory")
+    summary = {
+        "runs": len(results),
+        "victories": victories,
+        "mean_world_switches": sum(r["world_switches"] for r in results) / max(1, len(results)),
+        "elapsed_s": round(elapsed, 2),
+        "runs_per_minute": round(len(results) / elapsed * 60) if elapsed else None,
+    }
+    print(json.dumps(summary, indent=2))
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(results, f)
+
+
+if __name__ == "__main__":
+    main()
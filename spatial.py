@@ -0,0 +1,65 @@
+"""Uniform-grid spatial hash for broadphase rect and point queries."""
+
+import pygame
+
+
+class SpatialHash:
+    """Buckets integer item ids by the grid cells their bounding rect overlaps."""
+
+    def __init__(self, cell_size: int):
+        self.cell_size = cell_size
+        self.cells: dict[tuple[int, int], list[int]] = {}
+
+    def _cell_range(self, rect: pygame.Rect):
+        size = self.cell_size
+        x0 = rect.left // size
+        y0 = rect.top // size
+        x1 = (rect.right - 1) // size if rect.width > 0 else x0
+        y1 = (rect.bottom - 1) // size if rect.height > 0 else y0
+        return x0, y0, x1, y1
+
+    def insert(self, item: int, rect: pygame.Rect):
+        x0, y0, x1, y1 = self._cell_range(rect)
+        for cy in range(y0, y1 + 1):
+            for cx in range(x0, x1 + 1):
+                self.cells.setdefault((cx, cy), []).append(item)
+
+    def remove(self, item: int, rect: pygame.Rect):
+        x0, y0, x1, y1 = self._cell_range(rect)
+        for cy in range(y0, y1 + 1):
+            for cx in range(x0, x1 + 1):
+                bucket = self.cells.get((cx, cy))
+                if bucket and item in bucket:
+                    bucket.remove(item)
+                    if not bucket:
+                        del self.cells[(cx, cy)]
+
+    def insert_point(self, item: int, x: float, y: float):
+        size = self.cell_size
+        self.cells.setdefault((int(x // size), int(y // size)), []).append(item)
+
+    def remove_point(self, item: int, x: float, y: float):
+        size = self.cell_size
+        key = (int(x // size), int(y // size))
+        bucket = self.cells.get(key)
+        if bucket and item in bucket:
+            bucket.remove(item)
+            if not bucket:
+                del self.cells[key]
+
+    def candidates(self, rect: pygame.Rect) -> list[int]:
+        """Return sorted, de-duplicated ids whose cells overlap ``rect``."""
+        x0, y0, x1, y1 = self._cell_range(rect)
+        if x0 == x1 and y0 == y1:
+            return sorted(self.cells.get((x0, y0), ()))
+        found = set()
+        for cy in range(y0, y1 + 1):
+            for cx in range(x0, x1 + 1):
+                bucket = self.cells.get((cx, cy))
+                if bucket:
+                    found.update(bucket)
+        return sorted(found)
+
+    def candidates_at(self, x: float, y: float) -> list[int]:
+        size = self.cell_size
+        return list(self.cells.get((int(x // size), int(y // size)), ()))
@@ -0,0 +1,128 @@
+"""Persistent on-disk cache of rendered background chunks, read back through mmap."""
+
+import hashlib
+import mmap
+import os
+import threading
+
+import pygame
+import config
+import render
+
+# Bump when chunk rendering changes in a way config values do not capture.
+VERSION = 3
+
+
+def config_hash() -> str:
+    """Digest of every config value that affects background chunk pixels."""
+    relevant = (
+        VERSION,
+        config.WORLD_WIDTH,
+        config.WORLD_HEIGHT,
+        config.BG_TILE,
+        config.GEN_CELL,
+        config.BG_CHUNK_SIZE,
+        config.DESERT_ROCK_DENSITY,
+        config.FOREST_ROCK_DENSITY,
+        config.ROCK_SIZE_RANGE,
+        sorted((name, sorted(cfg.items())) for name, cfg in config.BIOMES.items()),
+    )
+    return hashlib.sha1(repr(relevant).encode("utf-8")).hexdigest()[:12]
+
+
+class TextureCache:
+    """Directory of raw RGBX chunk files with least-recently-used eviction by total size."""
+
+    def __init__(self, root: str = config.TEXTURE_CACHE_DIR, max_mb: float = config.TEXTURE_CACHE_MAX_MB):
+        self.root = root
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        os.makedirs(root, exist_ok=True)
+        self.total_bytes = sum(size for _, size, _ in self._files())
+        self._evict()
+
+    def _files(self):
+        for entry in os.scandir(self.root):
+            if not entry.is_dir():
+                continue
+            for item in os.scandir(entry.path):
+                if item.is_file():
+                    stat = item.stat()
+                    yield item.path, stat.st_size, stat.st_mtime
+
+    def _evict(self):
+        if self.total_bytes <= self.max_bytes:
+            return
+        target = self.max_bytes * 0.9
+        for path, size, _ in sorted(self._files(), key=lambda item: item[2]):
+            if self.total_bytes <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            self.total_bytes -= size
+        for entry in os.scandir(self.root):
+            if entry.is_dir() and not any(os.scandir(entry.path)):
+                os.rmdir(entry.path)
+
+    def world(self, seed: int, biome: str) -> "WorldTextures":
+        return WorldTextures(self, os.path.join(self.root, f"{biome}-{seed}-{config_hash()}"))
+
+
+class WorldTextures:
+    """Chunk files of one (seed, biome, config) combination."""
+
+    def __init__(self, cache: TextureCache, directory: str):
+        self.cache = cache
+        self.directory = directory
+
+    def _path(self, cx: int, cy: int) -> str:
+        return os.path.join(self.directory, f"{cx}_{cy}.raw")
+
+    def load(self, cx: int, cy: int, size: tuple[int, int]) -> pygame.Surface | None:
+        path = self._path(cx, cy)
+        try:
+            with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                if len(mapped) != size[0] * size[1] * 4:
+                    return None
+                view = pygame.image.frombuffer(mapped, size, "RGBX")
+                # Copy into the display format once so per-frame blits stay cheap; releases the map.
+                surf = render.new_surface(size)
+                surf.blit(view, (0, 0))
+                del view
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        return surf
+
+    def store(self, cx: int, cy: int, surf: pygame.Surface):
+        path = self._path(cx, cy)
+        data = pygame.image.tobytes(surf, "RGBX")
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError:
+            return
+        self.cache.total_bytes += len(data)
+        self.cache._evict()
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def shared() -> TextureCache | None:
+    """Process-wide cache, or None when disabled or the directory is unusable."""
+    global _shared
+    if not config.TEXTURE_CACHE_ENABLED:
+        return None
+    with _shared_lock:
+        if _shared is None:
+            try:
+                _shared = TextureCache()
+            except OSError:
+                return None
+    return _shared
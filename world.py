@@ -1,146 +1,276 @@
 """World generation, biomes, rocks, and camera handling."""
 
-import math
 import random
+from collections import OrderedDict
+from collections.abc import MutableMapping
+
 import pygame
+import background
 import config
+import pickups as pickup_store
+import procgen
+import spatial
+import texcache
+
+# Bump when world generation changes so saved pickup ids are not applied to a different layout.
+GENERATION = 3
 
 
 class Camera:
-    """Simple camera that follows the player while clamping to world bounds."""
+    """Simple camera that follows the player while clamping to world bounds.
+
+    ``scale`` is screen pixels per world pixel: below 1 the same world area is
+    drawn into a smaller internal canvas (see quality.py).
+    """
 
     def __init__(self, width: int, height: int):
         self.width = width
         self.height = height
         self.offset = pygame.Vector2(0, 0)
+        self.scale = 1.0
 
     def update(self, target_pos: pygame.Vector2, screen_rect: pygame.Rect):
-        self.offset.x = target_pos.x - screen_rect.width / 2
-        self.offset.y = target_pos.y - screen_rect.height / 2
-        self.offset.x = max(0, min(self.offset.x, self.width - screen_rect.width))
-        self.offset.y = max(0, min(self.offset.y, self.height - screen_rect.height))
+        view_width = screen_rect.width / self.scale
+        view_height = screen_rect.height / self.scale
+        self.offset.x = target_pos.x - view_width / 2
+        self.offset.y = target_pos.y - view_height / 2
+        self.offset.x = max(0, min(self.offset.x, self.width - view_width))
+        self.offset.y = max(0, min(self.offset.y, self.height - view_height))
 
     def apply(self, rect: pygame.Rect) -> pygame.Rect:
-        return rect.move(-self.offset.x, -self.offset.y)
+        if self.scale == 1.0:
+            return rect.move(-self.offset.x, -self.offset.y)
+        s = self.scale
+        return pygame.Rect(
+            round((rect.x - self.offset.x) * s), round((rect.y - self.offset.y) * s), round(rect.width * s), round(rect.height * s)
+        )
 
 
 class World:
     """Procedurally generated world for a given biome with pickups and rocks."""
 
-    def __init__(self, biome: str = "desert", seed: int | None = None):
+    def __init__(self, biome: str = "desert", seed: int | None = None, progress=None, lazy: bool = False):
         self.biome = biome
         self.seed = seed if seed is not None else random.randint(0, 999999)
-        random.seed(self.seed + (1 if biome == "forest" else 0))
         self.width = config.WORLD_WIDTH
         self.height = config.WORLD_HEIGHT
-        self.background = self._generate_background()
+        report = progress or (lambda fraction: None)
+        report(0.0)
+        self.gen = procgen.WorldGen(self.seed, biome, self.width, self.height)
         self.rocks = self._generate_rocks()
+        self.rock_index = self._build_rock_index()
+        report(0.3)
         self.pickups = self._generate_pickups()
+        self.pickup_total = len(self.pickups)
+        # Lazy worlds set up their background (and its disk cache) only when first drawn.
+        self._background = None
+        if not lazy:
+            report(0.4)
+            self._background = self._build_background()
+        report(1.0)
+
+    @property
+    def background(self):
+        if self._background is None:
+            self._background = self._build_background()
+        return self._background
+
+    @property
+    def materialized(self) -> bool:
+        return self._background is not None
+
+    def memory_bytes(self) -> int:
+        return self._background.memory_bytes() if self._background is not None else 0
+
+    def release(self):
+        """Keep only the logical state (seed, rocks, remaining pickups).
+
+        The background is set up again when the world is next drawn; its
+        chunks come back from the texture cache, or are re-rendered.
+        """
+        self._background = None
 
-    def _generate_background(self) -> pygame.Surface:
-        surf = pygame.Surface((self.width, self.height))
-        biome_cfg = config.BIOMES[self.biome]
-        base_colors = biome_cfg["base_colors"]
-        dune_color = biome_cfg["dune_color"]
-
-        for y in range(0, self.height, config.BG_TILE):
-            for x in range(0, self.width, config.BG_TILE):
-                color = random.choice(base_colors)
-                pygame.draw.rect(surf, color, (x, y, config.BG_TILE, config.BG_TILE))
-
-        # Add gentle sine-wave bands
-        for band in range(10):
-            amplitude = random.randint(4, 8)
-            wavelength = random.randint(140, 220)
-            for x in range(self.width):
-                y = int(self.height * (band + 1) / 11 + amplitude * math.sin(x / wavelength))
-                pygame.draw.line(surf, dune_color, (x, y), (x, y + 2))
-
-        # Add speckles for grain/grass
-        for _ in range(800):
-            rx = random.randint(0, self.width)
-            ry = random.randint(0, self.height)
-            radius = random.randint(1, 2)
-            pygame.draw.circle(surf, dune_color, (rx, ry), radius)
-        return surf
+    def _build_background(self):
+        bg = background.ChunkedBackground(self.biome, self.width, self.height, self.gen)
+        bg.static_layers.append(self._bake_rocks)
+        disk = texcache.shared()
+        if disk is not None:
+            bg.disk = disk.world(self.seed, self.biome)
+        return bg
 
     def _generate_rocks(self):
+        # Cell by cell from procgen: the same rocks whatever order (or thread) generates them.
         rocks = []
-        density = config.DESERT_ROCK_DENSITY if self.biome == "desert" else config.FOREST_ROCK_DENSITY
-        count = int(self.width * self.height * density)
-        for _ in range(count):
-            w = random.randint(*config.ROCK_SIZE_RANGE)
-            h = random.randint(*config.ROCK_SIZE_RANGE)
-            x = random.randint(0, self.width - w)
-            y = random.randint(0, self.height - h)
-            rocks.append(pygame.Rect(x, y, w, h))
+        for cell in self.gen.cells():
+            rocks.extend(self.gen.rocks(*cell))
         return rocks
 
-    def _generate_pickups(self):
-        pickups = []
-        count = random.randint(*config.PICKUP_COUNT_RANGE)
-        spawn = pygame.Vector2(config.PLAYER_SPAWN)
-        available = list(config.BIOMES[self.biome]["pickup_types"])
-        # Ensure lamp exists in forest
-        if self.biome == "forest" and "lamp" not in available:
-            available.append("lamp")
-        lamp_added = False
-        for _ in range(count):
-            ptype = random.choice(available)
-            if self.biome == "forest" and not lamp_added:
-                ptype = "lamp"
-                lamp_added = True
-            attempts = 0
-            while True:
-                pos = pygame.Vector2(
-                    random.randint(0, self.width),
-                    random.randint(0, self.height),
-                )
-                attempts += 1
-                if pos.distance_to(spawn) > config.PICKUP_MIN_DIST_FROM_SPAWN or attempts > 5:
-                    break
-            pickups.append({"type": ptype, "pos": pos})
+    def _build_rock_index(self) -> spatial.SpatialHash:
+        index = spatial.SpatialHash(config.ROCK_GRID_CELL)
+        for i, rock in enumerate(self.rocks):
+            index.insert(i, rock)
+        return index
+
+    def _bake_rocks(self, surface: pygame.Surface, area: pygame.Rect):
+        """Draw the rocks overlapping ``area`` into a background chunk."""
+        rock_color = config.BIOMES[self.biome]["rock_color"]
+        for rock in self.query_rect(area):
+            pygame.draw.rect(surface, rock_color, rock.move(-area.left, -area.top))
+
+    def _generate_pickups(self) -> pickup_store.PickupStore:
+        generated = []
+        for cell in self.gen.cells():
+            generated.extend(self.gen.pickups(*cell))
+        # Store ids are insertion order: add by generated id so both agree.
+        generated.sort()
+        pickups = pickup_store.PickupStore()
+        for _, ptype, x, y in generated:
+            pickups.add(ptype, x, y)
         return pickups
 
     def draw(self, surface: pygame.Surface, camera: Camera):
-        surface.blit(self.background, (-camera.offset.x, -camera.offset.y))
-        rock_color = config.BIOMES[self.biome]["rock_color"]
-        for rock in self.rocks:
-            pygame.draw.rect(surface, rock_color, camera.apply(rock))
-        for pickup in self.pickups:
-            color = config.PICKUP_COLORS[pickup["type"]]
-            rect = pygame.Rect(
-                pickup["pos"].x - config.PICKUP_SIZE / 2,
-                pickup["pos"].y - config.PICKUP_SIZE / 2,
-                config.PICKUP_SIZE,
-                config.PICKUP_SIZE,
-            )
+        # Rocks are baked into the background chunks; only pickups are drawn live.
+        self.background.draw(surface, camera)
+        half = config.PICKUP_SIZE / 2
+        width, height = surface.get_size()
+        view = pygame.Rect(camera.offset.x, camera.offset.y, width / camera.scale, height / camera.scale).inflate(
+            config.PICKUP_SIZE * 2, config.PICKUP_SIZE * 2
+        )
+        for pickup in self.pickups.in_rect(view):
+            color = config.PICKUP_COLORS[pickup.type]
+            rect = pygame.Rect(pickup.x - half, pickup.y - half, config.PICKUP_SIZE, config.PICKUP_SIZE)
             pygame.draw.rect(surface, color, camera.apply(rect))
 
-    def remove_pickup_at(self, pos: pygame.Vector2, radius: float = 12):
-        for pickup in list(self.pickups):
-            if pickup["pos"].distance_to(pos) <= radius:
-                self.pickups.remove(pickup)
-                return pickup
-        return None
+    def collect_pickups(self, pos: pygame.Vector2, radius: float = config.PICKUP_RADIUS) -> list[pickup_store.Pickup]:
+        """Remove and return every pickup within ``radius`` of ``pos``."""
+        return self.pickups.collect_radius(pos.x, pos.y, radius)
+
+    def query_rect(self, rect: pygame.Rect) -> list[pygame.Rect]:
+        """Rocks overlapping ``rect``, in generation order."""
+        rocks = self.rocks
+        return [rocks[i] for i in self.rock_index.candidates(rect) if rect.colliderect(rocks[i])]
+
+    def query_point(self, point) -> list[pygame.Rect]:
+        """Rocks containing ``point``, in generation order."""
+        x, y = point
+        rocks = self.rocks
+        return [rocks[i] for i in self.rock_index.candidates_at(x, y) if rocks[i].collidepoint(x, y)]
 
     def colliding_rocks(self, rect: pygame.Rect):
-        return [rock for rock in self.rocks if rect.colliderect(rock)]
+        return self.query_rect(rect)
 
     def to_dict(self):
+        """Seed plus a bitset of collected ids; pickups not generated from the seed are listed."""
         return {
             "seed": self.seed,
             "biome": self.biome,
-            "pickups": [
-                {"type": p["type"], "pos": [p["pos"].x, p["pos"].y]} for p in self.pickups
-            ],
+            "generation": GENERATION,
+            "pickup_total": self.pickup_total,
+            "collected": self.collected_bits().hex(),
+            "extra_pickups": [list(p) for p in self.extra_pickups()],
         }
 
+    def collected_bits(self) -> bytes:
+        """Bitset over generated pickup ids: bit ``i`` is set once pickup ``i`` is collected."""
+        return self.pickups.collected_bits(self.pickup_total)
+
+    def extra_pickups(self) -> list[tuple[str, float, float]]:
+        """``(type, x, y)`` of the remaining pickups not generated from the seed."""
+        store = self.pickups
+        return [(p.type, p.x, p.y) for p in map(store.get, range(self.pickup_total, len(store.types))) if store.alive[p.id]]
+
+    def restore_pickups(self, generation: int, pickup_total: int, bits: bytes, extras=()):
+        """Apply a saved bitset (see ``collected_bits``) and re-add the saved extras."""
+        # A different generation places other pickups under the same ids: keep them all.
+        if generation == GENERATION and pickup_total == self.pickup_total:
+            self.pickups.restore_collected(bits, self.pickup_total)
+        for ptype, x, y in extras:
+            self.pickups.add(ptype, x, y)
+
     @classmethod
-    def from_dict(cls, data: dict):
-        world = cls(biome=data.get("biome", "desert"), seed=data.get("seed"))
-        world.pickups = [
-            {"type": p["type"], "pos": pygame.Vector2(p["pos"][0], p["pos"][1])}
-            for p in data.get("pickups", [])
-        ]
+    def from_dict(cls, data: dict, lazy: bool = False):
+        world = cls(biome=data.get("biome", "desert"), seed=data.get("seed"), lazy=lazy)
+        if "collected" in data:
+            world.restore_pickups(
+                data.get("generation"), data.get("pickup_total"), bytes.fromhex(data["collected"]), data.get("extra_pickups", [])
+            )
+            return world
+        # Legacy saves list the remaining pickups by position; match them back to their generated ids.
+        store = world.pickups
+        generated = {(p.type, p.x, p.y): p.id for p in store}
+        remaining = set()
+        unmatched = []
+        for p in data.get("pickups", []):
+            pickup_id = generated.pop((p["type"], float(p["pos"][0]), float(p["pos"][1])), None)
+            if pickup_id is None:
+                unmatched.append(p)
+            else:
+                remaining.add(pickup_id)
+        for pickup_id in range(world.pickup_total):
+            if pickup_id not in remaining:
+                store.remove(pickup_id)
+        for p in unmatched:
+            store.add(p["type"], p["pos"][0], p["pos"][1])
         return world
+
+
+class WorldManager(MutableMapping):
+    """The generated worlds by biome, with their backgrounds held to one memory budget.
+
+    Inactive worlds give their backgrounds back, least recently active first,
+    until the active world's own chunk cache fits beside them; that cache is
+    then capped to whatever budget is left. Memory therefore stays flat however
+    many biomes are defined.
+    """
+
+    def __init__(self, worlds: dict | None = None, budget_mb: float = config.WORLD_MEMORY_BUDGET_MB):
+        self.budget = int(budget_mb * 1024 * 1024)
+        self.active = None
+        self._worlds: OrderedDict[str, World] = OrderedDict()  # least recently active first
+        self.update(worlds or {})
+
+    def __getitem__(self, name: str) -> World:
+        return self._worlds[name]
+
+    def __setitem__(self, name: str, world: World):
+        self._worlds[name] = world
+        self._worlds.move_to_end(name, last=False)
+        if self.active is not None:
+            self.trim()
+
+    def __delitem__(self, name: str):
+        del self._worlds[name]
+
+    def __iter__(self):
+        return iter(self._worlds)
+
+    def __len__(self) -> int:
+        return len(self._worlds)
+
+    def activate(self, name: str):
+        if name != self.active:
+            self.active = name
+            self._worlds.move_to_end(name)
+            self.trim()
+
+    def resident_bytes(self) -> int:
+        return sum(world.memory_bytes() for world in self._worlds.values())
+
+    def trim(self):
+        active = self._worlds.get(self.active)
+        others = self.resident_bytes()
+        reserve = 0
+        if active is not None:
+            bg = active.background  # about to be drawn: set it up now to cap its cache
+            own_cap = int(config.BG_CHUNK_CACHE_MB * 1024 * 1024)
+            # The active world is owed its own chunk budget; inactive ones share what is left.
+            reserve = min(self.budget, own_cap)
+            others -= active.memory_bytes()
+        for name, world in self._worlds.items():
+            if others <= self.budget - reserve:
+                break
+            if name != self.active and world.materialized:
+                others -= world.memory_bytes()
+                world.release()
+        if active is not None:
+            bg.max_bytes = min(own_cap, self.budget - others)